@@ -20,6 +20,7 @@ from app.core.graph.run.resume import resume_graph
 from app.core.graph.run.run import run_graph
 from app.core.graph.run.utils import get_nodes_from_strings
 from app.core.graph.sql_state_persistence.persistence import SqlStatePersistence
+from app.core.llm.http_client import close_openai_http_connections
 from app.core.models.models import ActionExecution, ControlExecution
 from app.core.storage_dependencies.repositories.providers import RepositoryProvider
 from app.core.storage_dependencies.storage_dependencies import get_provider
@@ -327,8 +328,15 @@ def _run_graph_by_execution_id_sync(
     """
     import asyncio
 
+    async def _run() -> None:
+        try:
+            await run_graph_by_execution_id(control_execution_id, credentials)
+        finally:
+            # The loop is closed after this run, so its pooled connections go too
+            await close_openai_http_connections()
+
     # Run the async function in a new event loop
-    asyncio.run(run_graph_by_execution_id(control_execution_id, credentials))
+    asyncio.run(_run())
 
 
 def create_delayed_control_execution_job(
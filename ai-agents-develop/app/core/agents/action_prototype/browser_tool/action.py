@@ -38,6 +38,7 @@ from app.core.agents.utils.browser_utils.file_processing import (
     process_downloaded_files_v2,
 )
 from app.core.agents.utils.browser_utils.mcp_process_management import (
+    playwright_mcp_command,
     stop_mcp_server_process,
 )
 from app.core.agents.utils.browser_utils.screenshot_upload import (
@@ -291,10 +292,11 @@ async def generic_browser_agent_playwright(
             )
         else:
             # Use direct MCP server (spawns the server process)
+            program, *program_args = playwright_mcp_command()
             server = MCPServerStdio(
-                "npx",
+                program,
                 args=[
-                    "@playwright/mcp@0.0.41",
+                    *program_args,
                     "--storage-state",
                     str(storage_state_path_obj),
                     "--isolated",
@@ -1,8 +1,11 @@
+import asyncio
 import ipaddress
+import re
+import secrets
 from io import BytesIO
-from typing import List
+from typing import Any, List
 from urllib.parse import urlparse
-from uuid import uuid4
+from uuid import UUID
 
 import aiohttp
 import logfire
@@ -50,31 +53,87 @@ class AddColumnInput(BaseModel):
     )
 
 
+_IP_LITERAL_RE = re.compile(r"^(?:\d|[0-9a-f]*:)")
+
+
 def validate_public_http_url(url: str) -> None:
     parsed = urlparse(url)
     if parsed.scheme not in {"http", "https"}:
         raise ValueError(f"Unsupported URL scheme: {parsed.scheme}")
     host = parsed.hostname or ""
     # Block localhost and literal private addresses
-    if host in {"localhost"}:
+    if host == "localhost":
         raise ValueError("Localhost is not allowed")
+    # Cheap prefilter: IP literals start with a digit or contain a colon, so most
+    # DNS names skip the ip_address parse. Names like 1password.com still pass it
+    # and are rejected by the parse below.
+    if not _IP_LITERAL_RE.match(host):
+        return
     try:
         ip = ipaddress.ip_address(host)
-        if (
-            ip.is_private
-            or ip.is_loopback
-            or ip.is_link_local
-            or ip.is_reserved
-            or ip.is_multicast
-        ):
-            raise ValueError("Private or local IPs are not allowed")
     except ValueError:
         # Not an IP literal; consider DNS allowlisting or egress firewall for full protection.
-        pass
+        return
+    if (
+        ip.is_private
+        or ip.is_loopback
+        or ip.is_link_local
+        or ip.is_reserved
+        or ip.is_multicast
+    ):
+        raise ValueError("Private or local IPs are not allowed")
+
+
+# Parsed downloads keyed by (action execution id, kind, url), so retries within
+# one action execution do not hit the network again. Other executions always
+# download afresh: the files can be edited between runs and may belong to
+# another customer. Insertion-ordered dict evicted FIFO.
+_DOWNLOAD_CACHE_MAXSIZE = 32
+_download_cache: dict[tuple[UUID, str, str], Any] = {}
+
+
+def _download_cache_get(run_id: UUID | None, kind: str, url: str) -> Any | None:
+    if run_id is None:
+        return None
+    return _download_cache.get((run_id, kind, url))
+
+
+def _download_cache_put(run_id: UUID | None, kind: str, url: str, value: Any) -> None:
+    if run_id is None:
+        return
+    if len(_download_cache) >= _DOWNLOAD_CACHE_MAXSIZE:
+        _download_cache.pop(next(iter(_download_cache)))
+    _download_cache[(run_id, kind, url)] = value
+
 
+def _dataframe_to_tsv(df: pd.DataFrame) -> str:
+    """Render a DataFrame as tab-separated text with 1-based row numbers.
+
+    Much cheaper than df.to_string() since no column alignment is computed.
+    """
+    df_str = df.fillna("").astype(str)
+    header = "\t" + "\t".join(df_str.columns)
+    rows = (
+        f"{i}\t" + "\t".join(row)
+        for i, row in enumerate(df_str.itertuples(index=False, name=None), start=1)
+    )
+    return "\n".join([header, *rows])
+
+
+async def download_excel_file(
+    url: str, run_id: UUID | None = None
+) -> tuple[pd.DataFrame | None, str]:
+    """Download and parse Excel file from URL. Returns DataFrame and readable content.
+
+    Successful downloads are memoized per run_id (the action execution id); without
+    a run_id the file is always downloaded.
+    """
+    cached = _download_cache_get(run_id, "excel", url)
+    if cached is not None:
+        cached_df, cached_content = cached
+        # Tools mutate the DataFrame in place, so hand out a copy
+        return cached_df.copy(), cached_content
 
-async def download_excel_file(url: str) -> tuple[pd.DataFrame | None, str]:
-    """Download and parse Excel file from URL. Returns DataFrame and readable content."""
     try:
         validate_public_http_url(url)
         logfire.info(f"Downloading Excel file from: {url}")
@@ -90,13 +149,10 @@ async def download_excel_file(url: str) -> tuple[pd.DataFrame | None, str]:
         df = pd.read_excel(excel_file, engine="openpyxl", header=None)
 
         # Set column names as indices (Column 1, Column 2, etc.)
-        df.columns = [f"Column {i+1}" for i in range(len(df.columns))]
+        df.columns = "Column " + pd.RangeIndex(1, len(df.columns) + 1).astype(str)
 
-        # Create display version with 1-based row indices
-        df_display = df.copy()
-        df_display.index = range(1, len(df) + 1)
-
-        readable_content = f"Excel file content (with 1-based row and column indices):\n{df_display.to_string(index=True)}"
+        readable_content = f"Excel file content (with 1-based row and column indices):\n{_dataframe_to_tsv(df)}"
+        _download_cache_put(run_id, "excel", url, (df.copy(), readable_content))
         return df, readable_content
 
     except Exception as e:
@@ -199,22 +255,51 @@ def save_excel_and_context(
     Returns:
         Tuple of (excel_result, context_result)
     """
-    # Save Excel file
-    excel_buffer = BytesIO()
-    df.to_excel(excel_buffer, index=False, header=False)
-    excel_bytes = excel_buffer.getvalue()
-    excel_file_name = f"{excel_prefix}_{uuid4().hex[:8]}.xlsx"
-    excel_result = save_file_to_local(excel_bytes, excel_file_name, working_dir)
+    # Save Excel file straight to disk, no intermediate in-memory copy
+    excel_file_name = f"{excel_prefix}_{secrets.token_hex(4)}.xlsx"
+    excel_file_path = f"{working_dir}/{excel_file_name}"
+    with open(excel_file_path, "wb") as f:
+        df.to_excel(f, index=False, header=False)
+    excel_result = LocalFileSaveResult(
+        file_name=excel_file_name, file_path=excel_file_path
+    )
 
     # Save context document
-    context_file_name = f"context_document_{uuid4().hex[:8]}.txt"
+    context_file_name = f"context_document_{secrets.token_hex(4)}.txt"
     context_result = save_file_to_local(context_content, context_file_name, working_dir)
 
     return excel_result, context_result
 
 
-async def download_context_document(url: str) -> str:
-    """Download and parse context document file from URL. Supports PDF, DOC, TXT, etc. Returns readable content."""
+# Share of U+FFFD characters above which a decoded payload is treated as binary
+_BINARY_REPLACEMENT_CHAR_RATIO = 0.1
+
+
+def _decode_context_document(content_bytes: bytes) -> str:
+    binary_message = f"Binary file downloaded ({len(content_bytes)} bytes) - unable to display as text"
+    # NUL bytes never appear in text documents, so a single memchr scan
+    # tells most binary payloads apart before decoding.
+    if b"\x00" in content_bytes:
+        return binary_message
+
+    # Parse as text in a single pass, JSON included; undecodable bytes become U+FFFD
+    text = content_bytes.decode("utf-8", errors="replace")
+    # Binary payloads without a NUL byte decode to mostly replacement characters
+    if text.count("\ufffd") > len(text) * _BINARY_REPLACEMENT_CHAR_RATIO:
+        return binary_message
+    return text
+
+
+async def download_context_document(url: str, run_id: UUID | None = None) -> str:
+    """Download and parse context document file from URL. Supports PDF, DOC, TXT, etc. Returns readable content.
+
+    Successful downloads are memoized per run_id (the action execution id); without
+    a run_id the document is always downloaded.
+    """
+    cached = _download_cache_get(run_id, "context", url)
+    if cached is not None:
+        return cached
+
     try:
         validate_public_http_url(url)
         logfire.info(f"Downloading context document from: {url}")
@@ -225,11 +310,9 @@ async def download_context_document(url: str) -> str:
                 response.raise_for_status()
                 content_bytes = await response.read()
 
-        # Parse as text
-        try:
-            return content_bytes.decode("utf-8")
-        except UnicodeDecodeError:
-            return f"Binary file downloaded ({len(content_bytes)} bytes) - unable to display as text"
+        content = _decode_context_document(content_bytes)
+        _download_cache_put(run_id, "context", url, content)
+        return content
 
     except Exception as e:
         logfire.error(f"Failed to download context document from {url}: {e}")
@@ -267,9 +350,13 @@ async def update_existing_cells(
 
         # Log agent's decision-making
         logfire.info(
-            f"Agent decision: updating column {input_data.column_index} ('{column_name}') with {len(input_data.values)} values starting from row {input_data.start_row_position}"
+            "Agent decision: updating column {column_index} ('{column_name}') with {values_count} values starting from row {start_row}",
+            column_index=input_data.column_index,
+            column_name=column_name,
+            values_count=len(input_data.values),
+            start_row=input_data.start_row_position,
         )
-        logfire.info(f"Agent values: {input_data.values}")
+        logfire.debug("Agent values", values=input_data.values)
 
         # Convert to 0-based index for pandas operations
         start_row_idx = input_data.start_row_position - 1
@@ -281,13 +368,21 @@ async def update_existing_cells(
             df.at[row_idx, column_name] = value
             updates_applied += 1
 
-        # Save Excel and context files
-        excel_result, context_result = save_excel_and_context(
-            df, ctx.deps.context_content, ctx.deps.working_dir, "updated_sheet"
+        # Save Excel and context files off the event loop
+        excel_result, context_result = await asyncio.to_thread(
+            save_excel_and_context,
+            df,
+            ctx.deps.context_content,
+            ctx.deps.working_dir,
+            "updated_sheet",
         )
 
         logfire.info(
-            f"Updated {updates_applied} cells in column {input_data.column_index} ('{column_name}') starting from row {input_data.start_row_position}"
+            "Updated {updates_applied} cells in column {column_index} ('{column_name}') starting from row {start_row}",
+            updates_applied=updates_applied,
+            column_index=input_data.column_index,
+            column_name=column_name,
+            start_row=input_data.start_row_position,
         )
 
         # Return structured result
@@ -330,9 +425,12 @@ async def add_new_column(
 
         # Log agent's decision-making
         logfire.info(
-            f"Agent decision: adding new column '{column_name}' at position {input_data.column_position}, values_count={len(input_data.values)}"
+            "Agent decision: adding new column '{column_name}' at position {column_position}, values_count={values_count}",
+            column_name=column_name,
+            column_position=input_data.column_position,
+            values_count=len(input_data.values),
         )
-        logfire.info(f"Agent values: {input_data.values}")
+        logfire.debug("Agent values", values=input_data.values)
 
         # Add new column with specified name and values at the specified position
         if input_data.column_position is not None:
@@ -345,22 +443,24 @@ async def add_new_column(
             # Append column at the end
             df[column_name] = input_data.values
 
-        # Save Excel and context files
-        excel_result, context_result = save_excel_and_context(
-            df, ctx.deps.context_content, ctx.deps.working_dir, "modified_sheet"
+        # Save Excel and context files off the event loop
+        excel_result, context_result = await asyncio.to_thread(
+            save_excel_and_context,
+            df,
+            ctx.deps.context_content,
+            ctx.deps.working_dir,
+            "modified_sheet",
         )
 
         # Create summary of filled values
         values_filled = len(input_data.values)
         total_rows = len(df)
 
-        column_position_info = (
-            f" at column position {input_data.column_position}"
-            if input_data.column_position is not None
-            else " at the end"
-        )
         logfire.info(
-            f"Modified Excel file with column '{column_name}' containing {values_filled} values{column_position_info}"
+            "Modified Excel file with column '{column_name}' containing {values_filled} values at column position {column_position}",
+            column_name=column_name,
+            values_filled=values_filled,
+            column_position=input_data.column_position or "end",
         )
 
         # Return structured result
@@ -388,6 +488,11 @@ QUESTIONNAIRE_ASSISTANT_AGENT = Agent(
 )
 
 
+def _text_log(data: str) -> PlainTextLog:
+    # Progress messages are trusted strings, skip pydantic validation
+    return PlainTextLog.model_construct(data=data)
+
+
 async def custom_questionnaire_assistant(
     ctx: RunContext[ActionDeps],
     sheet_url: str,
@@ -397,44 +502,39 @@ async def custom_questionnaire_assistant(
 
     try:
         # Download files with specific parsers
-        await ctx.deps.add_log(PlainTextLog(data="Starting document downloads..."))
+        await ctx.deps.add_log(_text_log("Starting document downloads..."))
         logfire.info("Downloading Excel sheet and context document")
 
         await ctx.deps.add_log(
-            PlainTextLog(data="Downloading and parsing Excel spreadsheet...")
+            _text_log("Downloading and parsing Excel spreadsheet...")
+        )
+        original_df, sheet_content = await download_excel_file(
+            sheet_url, ctx.deps.action_id
         )
-        original_df, sheet_content = await download_excel_file(sheet_url)
 
-        await ctx.deps.add_log(PlainTextLog(data="Downloading context document..."))
-        context_content = await download_context_document(context_document_url)
+        await ctx.deps.add_log(_text_log("Downloading context document..."))
+        context_content = await download_context_document(
+            context_document_url, ctx.deps.action_id
+        )
 
         if original_df is None:
             await ctx.deps.add_log(
-                PlainTextLog(data="Error: Failed to download or parse Excel file")
+                _text_log("Error: Failed to download or parse Excel file")
             )
             raise Exception("Failed to download/parse Excel file")
 
         await ctx.deps.add_log(
-            PlainTextLog(
+            _text_log(
                 data=f"Successfully processed spreadsheet with {len(original_df)} rows"
             )
         )
 
-        # Debug: Print sheet content
-        logfire.info("=== SHEET CONTENT ===")
-        logfire.info(sheet_content)
-        logfire.info("=== END SHEET CONTENT ===")
-
-        logfire.info("=== CONTEXT CONTENT ===")
-        logfire.info(
-            context_content[:1000] + "..."
-            if len(context_content) > 1000
-            else context_content
-        )
-        logfire.info("=== END CONTEXT CONTENT ===")
+        # Debug: full document dumps are attached as attributes, not formatted
+        logfire.debug("Sheet content", sheet_content=sheet_content)
+        logfire.debug("Context content", context_content=context_content[:1000])
 
         await ctx.deps.add_log(
-            PlainTextLog(data="Analyzing spreadsheet content and context document...")
+            _text_log("Analyzing spreadsheet content and context document...")
         )
 
         # Create deps for the agent with original DataFrame and context content
@@ -448,9 +548,7 @@ async def custom_questionnaire_assistant(
             }
         )
 
-        await ctx.deps.add_log(
-            PlainTextLog(data="Running AI agent to process spreadsheet...")
-        )
+        await ctx.deps.add_log(_text_log("Running AI agent to process spreadsheet..."))
         result = await QUESTIONNAIRE_ASSISTANT_AGENT.run(
             f"""
             Sheet Content (contains questions):
@@ -465,12 +563,12 @@ async def custom_questionnaire_assistant(
         )
 
         await ctx.deps.add_log(
-            PlainTextLog(data="Successfully completed spreadsheet processing")
+            _text_log("Successfully completed spreadsheet processing")
         )
 
         return result.output
 
     except Exception as e:
-        await ctx.deps.add_log(PlainTextLog(data=f"Error: {str(e)}"))
+        await ctx.deps.add_log(_text_log(f"Error: {str(e)}"))
         logfire.error(f"CustomQuestionnaireAssistant failed: {e}")
         raise
@@ -67,6 +67,18 @@ class CustomQuestionnaireAssistantV2AgentDeps(ActionDeps):
         description="The content of the context document",
         repr=False,
     )
+    pending_columns: list[tuple[int, str, List[str]]] = Field(
+        default_factory=list,
+        description="Columns added by add_new_column as (0-based position, name, values), written into the rows on save instead of being inserted into original_dataframe",
+        repr=False,
+        exclude=True,
+    )
+    observations: dict[str, str] = Field(
+        default_factory=dict,
+        description="Full tool outputs that were returned to the agent as previews, keyed by reference",
+        repr=False,
+        exclude=True,
+    )
 
 
 class LocalFileSaveResult(BaseModel):
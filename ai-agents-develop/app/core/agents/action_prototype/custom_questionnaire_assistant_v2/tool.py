@@ -1,21 +1,31 @@
+import asyncio
+import hashlib
 import ipaddress
+import json
 import os
 import pathlib
-from io import BytesIO
+import secrets
+import shutil
 from typing import List
 from urllib.parse import urlparse
 from uuid import uuid4
 
 import logfire
+import numpy as np
 import pandas as pd
 from alltrue.agents.schema.action_execution import PlainTextLog
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
 from httpx import HTTPStatusError
+from openpyxl import Workbook
 from pydantic import BaseModel, Field
 from pydantic_ai import Agent, ModelRetry, RunContext, Tool
 from pydantic_ai.mcp import MCPServerStdio
+from python_calamine import CalamineError
 
 from app.core.agents.action_prototype.custom_questionnaire_assistant_v2.prompt import (
     CUSTOM_QUESTIONNAIRE_ASSISTANT_V2_PROMPT,
+    CUSTOM_QUESTIONNAIRE_ASSISTANT_V2_TASK_PROMPT,
 )
 from app.core.agents.action_prototype.custom_questionnaire_assistant_v2.schema import (
     CustomQuestionnaireAssistantV2AgentDeps,
@@ -24,8 +34,11 @@ from app.core.agents.action_prototype.custom_questionnaire_assistant_v2.schema i
     ProcessingResult,
 )
 from app.core.graph.deps.action_deps import ActionDeps
+from app.core.graph.deps.base_deps import ControlInfo
 from app.core.llm.pydanticai.openai_model import get_pydanticai_openai_llm
-from mcp_server.utils.google_token_refresh import get_refreshed_credentials_json
+from mcp_server.utils.google_token_refresh import (
+    get_cached_refreshed_credentials_json,
+)
 
 
 class UpdateCellsInput(BaseModel):
@@ -89,6 +102,94 @@ def _resolve_and_guard_path(path: str, working_dir: str) -> pathlib.Path:
     return p
 
 
+# Tool results longer than this are returned to the model as a compact preview
+# plus a reference; the full text stays in deps and is fetched on demand.
+OBSERVATION_INLINE_MAX_CHARS = 8000
+
+
+def _mask_observation(
+    deps: CustomQuestionnaireAssistantV2AgentDeps,
+    content: str,
+    preview: dict,
+) -> str:
+    if len(content) <= OBSERVATION_INLINE_MAX_CHARS:
+        return content
+    ref = f"obs:{uuid4().hex}"
+    deps.observations[ref] = content
+    return json.dumps({"ref": ref, **preview}, ensure_ascii=False, default=str)
+
+
+def _cell_text(value) -> str:
+    return "" if pd.isna(value) else str(value)
+
+
+def _render_rows(df: pd.DataFrame) -> str:
+    """Render the sheet as tab-separated rows prefixed with 1-based row numbers.
+
+    Iterates the frame directly, so no display copy or aligned to_string() is built.
+    """
+    header = "\t" + "\t".join(df.columns)
+    rows = (
+        f"{i}\t" + "\t".join(_cell_text(value) for value in row)
+        for i, row in enumerate(df.itertuples(index=False, name=None), start=1)
+    )
+    return "\n".join([header, *rows])
+
+
+def _preview_rows(part: pd.DataFrame) -> dict[int, list[str]]:
+    """Map 1-based row numbers to cell text for a slice of the sheet."""
+    return {
+        index + 1: [_cell_text(value) for value in row]
+        for index, row in zip(part.index, part.itertuples(index=False, name=None))
+    }
+
+
+async def _load_excel_file(
+    deps: CustomQuestionnaireAssistantV2AgentDeps, safe_path: pathlib.Path
+) -> str:
+    """Load the sheet into deps.original_dataframe and return its (masked) content."""
+    # calamine (Rust) parses xlsx several times faster than openpyxl
+    df = await asyncio.to_thread(
+        pd.read_excel, str(safe_path), engine="calamine", header=None
+    )
+    df.columns = "Column " + pd.RangeIndex(1, len(df.columns) + 1).astype(str)
+
+    readable_content = (
+        f"Excel file content (with 1-based row and column indices):\n{_render_rows(df)}"
+    )
+    deps.original_dataframe = df
+    deps.pending_columns = []
+    logfire.info("Original dataframe loaded with shape {shape}", shape=df.shape)
+    logfire.debug("Original dataframe preview", head=_preview_rows(df.head(5)))
+
+    return _mask_observation(
+        deps,
+        readable_content,
+        {
+            "shape": list(df.shape),
+            "columns": list(df.columns),
+            "head": _preview_rows(df.head(5)),
+            "tail": _preview_rows(df.tail(3)),
+            "empty_cells_per_column": {
+                column: int(count) for column, count in df.isna().sum().items()
+            },
+        },
+    )
+
+
+async def _load_context_document(
+    deps: CustomQuestionnaireAssistantV2AgentDeps, safe_path: pathlib.Path
+) -> str:
+    """Load the document into deps.context_content and return its (masked) content."""
+    content = await asyncio.to_thread(safe_path.read_text, encoding="utf-8")
+    deps.context_content = content
+    return _mask_observation(
+        deps,
+        content,
+        {"char_len": len(content), "head": content[:2000], "tail": content[-500:]},
+    )
+
+
 async def read_excel_file(
     ctx: RunContext[CustomQuestionnaireAssistantV2AgentDeps],
     downloaded_sheet_file_path: str,
@@ -100,19 +201,18 @@ async def read_excel_file(
         safe_path = _resolve_and_guard_path(
             downloaded_sheet_file_path, ctx.deps.working_dir
         )
-        df = pd.read_excel(str(safe_path), engine="openpyxl", header=None)
-        df.columns = [f"Column {i+1}" for i in range(len(df.columns))]
-        df_display = df.copy()
-        df_display.index = range(1, len(df) + 1)
-
-        readable_content = f"Excel file content (with 1-based row and column indices):\n{df_display.to_string(index=True)}"
-        ctx.deps.original_dataframe = df
-        logfire.info(f"Original dataframe: {df.head(5)}")
-        return readable_content
+        return await _load_excel_file(ctx.deps, safe_path)
 
-    except Exception as e:
+    except ModelRetry:
+        raise
+    except (OSError, ValueError, CalamineError) as e:
+        # Missing/unreadable/corrupt file: the model can fix the path or re-export
         logfire.error(f"Failed to read Excel file: {e}")
         raise ModelRetry(f"Retryable Excel read error: {e}")
+    except Exception as e:
+        # Anything else will not succeed on retry, fail the run right away
+        logfire.error(f"Unexpected error reading Excel file: {e}")
+        raise
 
 
 async def read_context_document(
@@ -126,14 +226,33 @@ async def read_context_document(
         safe_path = _resolve_and_guard_path(
             downloaded_context_document_file_path, ctx.deps.working_dir
         )
-        with open(safe_path, "r", encoding="utf-8") as f:
-            content = f.read()
-        ctx.deps.context_content = content
-        return content
+        return await _load_context_document(ctx.deps, safe_path)
 
-    except Exception as e:
+    except ModelRetry:
+        raise
+    except (OSError, UnicodeDecodeError) as e:
         logfire.error(f"Failed to read context document: {e}")
         raise ModelRetry(f"Retryable context document read error: {e}")
+    except Exception as e:
+        logfire.error(f"Unexpected error reading context document: {e}")
+        raise
+
+
+async def get_observation(
+    ctx: RunContext[CustomQuestionnaireAssistantV2AgentDeps], ref: str
+) -> str:
+    """
+    Return the full content behind a preview returned by read_excel_file or read_context_document.
+
+    Args:
+        ref: The "ref" value of the preview, e.g. "obs:1f2e..."
+    """
+    try:
+        return ctx.deps.observations[ref]
+    except KeyError:
+        raise ModelRetry(
+            f"Unknown observation reference '{ref}'. Use the exact 'ref' value returned by read_excel_file or read_context_document."
+        )
 
 
 def save_file_to_local(
@@ -149,16 +268,14 @@ def save_file_to_local(
     Returns:
         LocalFileSaveResult with file name and path
     """
-    file_path = f"{working_dir}/{file_name}"
+    file_path = pathlib.Path(working_dir) / file_name
 
     if isinstance(content, str):
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(content)
+        file_path.write_text(content, encoding="utf-8")
     else:
-        with open(file_path, "wb") as f:
-            f.write(content)
+        file_path.write_bytes(content)
 
-    return LocalFileSaveResult(file_name=file_name, file_path=file_path)
+    return LocalFileSaveResult(file_name=file_name, file_path=str(file_path))
 
 
 def _validate_dataframe_exists(df: pd.DataFrame | None) -> None:
@@ -169,25 +286,38 @@ def _validate_dataframe_exists(df: pd.DataFrame | None) -> None:
         )
 
 
-def _validate_column_index(column_index: int, df: pd.DataFrame) -> None:
-    """Validate column index is within bounds (1-based)."""
-    if column_index < 1 or column_index > len(df.columns):
+def _validate_updates(updates: List[UpdateCellsInput], df: pd.DataFrame) -> None:
+    """Validate column indices and row capacity (1-based) of all updates at once."""
+    if not updates:
         raise ModelRetry(
-            f"Column index {column_index} is invalid. Valid column indices are 1 to {len(df.columns)}. "
-            f"The spreadsheet has {len(df.columns)} columns."
+            "No updates were provided. Provide at least one column update."
         )
 
+    num_rows, num_columns = df.shape
+    columns = np.fromiter((u.column_index for u in updates), dtype=np.int64)
+    starts = np.fromiter((u.start_row_position for u in updates), dtype=np.int64)
+    counts = np.fromiter((len(u.values) for u in updates), dtype=np.int64)
 
-def _validate_row_capacity(start_row: int, values_count: int, df: pd.DataFrame) -> None:
-    """Validate that values can fit in the DataFrame starting from start_row."""
-    if start_row < 1:
-        raise ModelRetry(f"start_row_position must be at least 1, got {start_row}")
+    bad_columns = np.flatnonzero((columns < 1) | (columns > num_columns))
+    if bad_columns.size:
+        column_index = int(columns[bad_columns[0]])
+        raise ModelRetry(
+            f"Column index {column_index} is invalid. Valid column indices are 1 to {num_columns}. "
+            f"The spreadsheet has {num_columns} columns."
+        )
 
-    end_row_idx = (start_row - 1) + values_count
-    if end_row_idx > len(df):
+    bad_starts = np.flatnonzero(starts < 1)
+    if bad_starts.size:
         raise ModelRetry(
-            f"Cannot insert {values_count} values starting at row {start_row}. "
-            f"This would exceed the spreadsheet which has {len(df)} rows. "
+            f"start_row_position must be at least 1, got {int(starts[bad_starts[0]])}"
+        )
+
+    overflows = np.flatnonzero(starts - 1 + counts > num_rows)
+    if overflows.size:
+        i = overflows[0]
+        raise ModelRetry(
+            f"Cannot insert {int(counts[i])} values starting at row {int(starts[i])} of column {int(columns[i])}. "
+            f"This would exceed the spreadsheet which has {num_rows} rows. "
             f"Please provide fewer values or start from an earlier row position."
         )
 
@@ -201,23 +331,31 @@ def _validate_values_match_rows(values: List[str], df: pd.DataFrame) -> None:
         )
 
 
-def _validate_column_position(column_position: int | None, df: pd.DataFrame) -> None:
+def _validate_column_position(column_position: int | None, num_columns: int) -> None:
     """Validate column position is within valid bounds (1-based)."""
     if column_position is not None:
-        max_position = df.shape[1] + 1  # Can insert after the last column
+        max_position = num_columns + 1  # Can insert after the last column
         if column_position < 1 or column_position > max_position:
             raise ModelRetry(
                 f"Column position {column_position} is invalid. "
                 f"Valid column positions are 1 to {max_position} (1-based). "
-                f"The spreadsheet has {df.shape[1]} columns."
+                f"The spreadsheet has {num_columns} columns."
             )
 
 
+def _apply_pending_columns(deps: CustomQuestionnaireAssistantV2AgentDeps) -> None:
+    """Insert the columns deferred by add_new_column into original_dataframe."""
+    for position, column_name, values in deps.pending_columns:
+        deps.original_dataframe.insert(position, column_name, values)
+    deps.pending_columns = []
+
+
 def save_excel_and_context(
     df: pd.DataFrame,
     context_content: str,
     working_dir: str,
     excel_prefix: str = "processed_sheet",
+    pending_columns: List[tuple[int, str, List[str]]] | None = None,
 ) -> tuple[LocalFileSaveResult, LocalFileSaveResult]:
     """Save Excel dataframe and context document, return both results.
 
@@ -226,19 +364,32 @@ def save_excel_and_context(
         context_content: Context document content
         working_dir: Directory to save files in
         excel_prefix: Prefix for Excel filename
+        pending_columns: (0-based position, name, values) of columns to write
+            into each row, in insertion order, without inserting them into df
 
     Returns:
         Tuple of (excel_result, context_result)
     """
-    # Save Excel file
-    excel_buffer = BytesIO()
-    df.to_excel(excel_buffer, index=False, header=False)
-    excel_bytes = excel_buffer.getvalue()
-    excel_file_name = f"{excel_prefix}_{uuid4().hex[:8]}.xlsx"
-    excel_result = save_file_to_local(excel_bytes, excel_file_name, working_dir)
+    # Save Excel file, streaming rows through a write-only workbook instead of
+    # building the full cell tree in memory as df.to_excel does
+    excel_file_name = f"{excel_prefix}_{secrets.token_hex(4)}.xlsx"
+    excel_file_path = str(pathlib.Path(working_dir) / excel_file_name)
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(title="Sheet1")
+    for i, row in enumerate(df.itertuples(index=False, name=None)):
+        # Missing values are written as empty cells, as df.to_excel does
+        row = [None if pd.isna(value) else value for value in row]
+        if pending_columns:
+            for position, _, values in pending_columns:
+                row.insert(position, values[i])
+        worksheet.append(row)
+    workbook.save(excel_file_path)
+    excel_result = LocalFileSaveResult(
+        file_name=excel_file_name, file_path=excel_file_path
+    )
 
     # Save context document
-    context_file_name = f"context_document_{uuid4().hex[:8]}.txt"
+    context_file_name = f"context_document_{secrets.token_hex(4)}.txt"
     context_result = save_file_to_local(context_content, context_file_name, working_dir)
 
     return excel_result, context_result
@@ -246,16 +397,20 @@ def save_excel_and_context(
 
 async def update_existing_cells(
     ctx: RunContext[CustomQuestionnaireAssistantV2AgentDeps],
-    input_data: UpdateCellsInput,
+    updates: List[UpdateCellsInput],
 ) -> ProcessingResult:
     """Update values in existing cells of the spreadsheet.
 
     This tool is for updating existing columns with new values. Use this when you want to
-    fill in empty cells or update existing values in columns that already exist.
+    fill in empty cells or update existing values in columns that already exist, e.g. an
+    "Answer" or "Response" column. Each update writes its values to consecutive rows of
+    column_index (1-based) starting at start_row_position (1-based).
+    Pass every column update in a single call; the spreadsheet is saved once after
+    all of them are applied.
 
     Args:
         ctx: RunContext containing original DataFrame in context
-        input_data: UpdateCellsInput containing column name and list of (row, value) updates
+        updates: List of UpdateCellsInput, each containing a column index, the values and the start row
 
     Returns:
         ProcessingResult with updated spreadsheet and context document
@@ -264,39 +419,62 @@ async def update_existing_cells(
         # Get original DataFrame from context
         df = ctx.deps.original_dataframe
         _validate_dataframe_exists(df)
-        _validate_column_index(input_data.column_index, df)
-        _validate_row_capacity(
-            input_data.start_row_position, len(input_data.values), df
-        )
-
-        # Get the actual column name from the index
-        column_name = df.columns[
-            input_data.column_index - 1
-        ]  # Convert to 0-based index
-
-        # Log agent's decision-making
-        logfire.info(
-            f"Agent decision: updating column {input_data.column_index} ('{column_name}') with {len(input_data.values)} values starting from row {input_data.start_row_position}"
-        )
-        logfire.info(f"Agent values: {input_data.values}")
-
-        # Convert to 0-based index for pandas operations
-        start_row_idx = input_data.start_row_position - 1
+        # Column indices refer to the sheet including columns added so far
+        _apply_pending_columns(ctx.deps)
+        _validate_updates(updates, df)
 
-        # Apply updates to consecutive rows
         updates_applied = 0
-        for i, value in enumerate(input_data.values):
-            row_idx = start_row_idx + i
-            df.at[row_idx, column_name] = value
-            updates_applied += 1
-
-        # Save Excel and context files
-        excel_result, context_result = save_excel_and_context(
-            df, ctx.deps.context_content, ctx.deps.working_dir, "updated_sheet"
+        for input_data in updates:
+            # Get the actual column name from the index
+            column_name = df.columns[
+                input_data.column_index - 1
+            ]  # Convert to 0-based index
+
+            # Log agent's decision-making
+            logfire.info(
+                "Agent decision: updating column {column_index} ('{column_name}') with {values_count} values starting from row {start_row}",
+                column_index=input_data.column_index,
+                column_name=column_name,
+                values_count=len(input_data.values),
+                start_row=input_data.start_row_position,
+            )
+            logfire.debug("Agent values", values=input_data.values)
+
+            # Convert to 0-based index for pandas operations
+            start_row_idx = input_data.start_row_position - 1
+            column_idx = input_data.column_index - 1
+            values_count = len(input_data.values)
+
+            # Answer columns are often read as all-NaN float columns. Typed columns
+            # become object columns before the string values are stored, instead of
+            # an incompatible-dtype upcast on every write; the cells that are not
+            # updated keep their numbers and are still saved as numbers
+            column = df.iloc[:, column_idx]
+            if not (
+                pd.api.types.is_object_dtype(column)
+                or isinstance(column.dtype, pd.StringDtype)
+            ):
+                df[column_name] = column.astype(object)
+
+            # Apply updates to consecutive rows in a single slice assignment
+            df.iloc[start_row_idx : start_row_idx + values_count, column_idx] = (
+                input_data.values
+            )
+            updates_applied += values_count
+
+        # Save Excel and context files off the event loop
+        excel_result, context_result = await asyncio.to_thread(
+            save_excel_and_context,
+            df,
+            ctx.deps.context_content,
+            ctx.deps.working_dir,
+            "updated_sheet",
         )
 
         logfire.info(
-            f"Updated {updates_applied} cells in column {input_data.column_index} ('{column_name}') starting from row {input_data.start_row_position}"
+            "Updated {updates_applied} cells across {updates_count} column update(s)",
+            updates_applied=updates_applied,
+            updates_count=len(updates),
         )
 
         # Return structured result
@@ -318,7 +496,9 @@ async def add_new_column(
     """Add a new column to the Excel file with specified values.
 
     This tool is for creating entirely new columns. Use this when you need to add
-    a column that doesn't exist in the original spreadsheet.
+    a column that doesn't exist in the original spreadsheet. Provide exactly one value
+    per row for ALL rows, in the same order as the rows appear. column_position
+    (1-based) is optional; the column is appended at the end if it is not given.
 
     Args:
         ctx: RunContext containing original DataFrame in context
@@ -332,44 +512,50 @@ async def add_new_column(
         df = ctx.deps.original_dataframe
         _validate_dataframe_exists(df)
         _validate_values_match_rows(input_data.values, df)
-        _validate_column_position(input_data.column_position, df)
+        num_columns = len(df.columns) + len(ctx.deps.pending_columns)
+        _validate_column_position(input_data.column_position, num_columns)
 
         # Generate column name automatically
-        column_name = f"Column {len(df.columns) + 1}"
+        column_name = f"Column {num_columns + 1}"
 
         # Log agent's decision-making
         logfire.info(
-            f"Agent decision: adding new column '{column_name}' at position {input_data.column_position}, values_count={len(input_data.values)}"
+            "Agent decision: adding new column '{column_name}' at position {column_position}, values_count={values_count}",
+            column_name=column_name,
+            column_position=input_data.column_position,
+            values_count=len(input_data.values),
+        )
+        logfire.debug("Agent values", values=input_data.values)
+
+        # Convert 1-based position to 0-based, appending at the end if not given.
+        # The column is not inserted into the DataFrame (which would shift every
+        # column after it); it is written into each row while the sheet is saved.
+        position = (
+            input_data.column_position - 1
+            if input_data.column_position is not None
+            else num_columns
         )
-        logfire.info(f"Agent values: {input_data.values}")
-
-        # Add new column with specified name and values at the specified position
-        if input_data.column_position is not None:
-
-            # Convert 1-based position to 0-based for pandas
-            pandas_position = input_data.column_position - 1
-            # Insert column at specific position
-            df.insert(pandas_position, column_name, input_data.values)
-        else:
-            # Append column at the end
-            df[column_name] = input_data.values
-
-        # Save Excel and context files
-        excel_result, context_result = save_excel_and_context(
-            df, ctx.deps.context_content, ctx.deps.working_dir, "modified_sheet"
+        ctx.deps.pending_columns.append((position, column_name, input_data.values))
+
+        # Save Excel and context files off the event loop
+        excel_result, context_result = await asyncio.to_thread(
+            save_excel_and_context,
+            df,
+            ctx.deps.context_content,
+            ctx.deps.working_dir,
+            "modified_sheet",
+            ctx.deps.pending_columns,
         )
 
         # Create summary of filled values
         values_filled = len(input_data.values)
         total_rows = len(df)
 
-        column_position_info = (
-            f" at column position {input_data.column_position}"
-            if input_data.column_position is not None
-            else " at the end"
-        )
         logfire.info(
-            f"Modified Excel file with column '{column_name}' containing {values_filled} values{column_position_info}"
+            "Modified Excel file with column '{column_name}' containing {values_filled} values at column position {column_position}",
+            column_name=column_name,
+            values_filled=values_filled,
+            column_position=input_data.column_position or "end",
         )
 
         # Return structured result
@@ -385,6 +571,244 @@ async def add_new_column(
         raise
 
 
+def google_drive_toolset(google_token: str, working_dir: str) -> MCPServerStdio:
+    # The MCP server takes its credentials and output directory from its
+    # process env, so it is built per run while the agent itself is shared.
+    refreshed_credentials_json = get_cached_refreshed_credentials_json(google_token)
+    return MCPServerStdio(
+        command="uv",
+        args=["run", "python", "-m", "mcp_server.google_drive.server"],
+        env={
+            "GOOGLE_CREDENTIALS": refreshed_credentials_json,
+            "LOGFIRE_TOKEN": os.environ["LOGFIRE_TOKEN"],
+            "LOGFIRE_SERVICE_NAME": os.environ["LOGFIRE_SERVICE_NAME"],
+            "WORKING_DIR": str(pathlib.Path(working_dir).resolve()),
+        },
+    )
+
+
+# Final outputs of previous runs keyed by customer, entity, Google account, goal,
+# file names and the Drive id and revision of the exported files. A hit skips the
+# whole agent trajectory.
+_RESPONSE_CACHE_MAXSIZE = 64
+_response_cache: dict[str, CustomQuestionnaireAssistantV2Output] = {}
+
+SPREADSHEET_MIME_TYPE = "application/vnd.google-apps.spreadsheet"
+DOCUMENT_MIME_TYPE = "application/vnd.google-apps.document"
+
+
+def _drive_query_literal(value: str) -> str:
+    """Escape a value for use inside a quoted Drive files.list query string."""
+    return value.replace("\\", "\\\\").replace("'", "\\'")
+
+
+def _drive_file_query(file_name: str, mime_type: str) -> str:
+    """Drive files.list query the export looks files up with."""
+    return f"name = '{_drive_query_literal(file_name)}' and mimeType = '{mime_type}' and trashed = false"
+
+
+def _drive_revision(files: list[tuple[str, str | None]]) -> str:
+    """Fingerprint the (id, modifiedTime) of the files a run exports."""
+    return "|".join(f"{file_id}:{modified_time}" for file_id, modified_time in files)
+
+
+def _drive_service(google_token: str):
+    credentials_json = get_cached_refreshed_credentials_json(google_token)
+    creds = Credentials.from_authorized_user_info(json.loads(credentials_json))
+    return build("drive", "v3", credentials=creds, cache_discovery=False)
+
+
+def _drive_account_id(drive) -> str:
+    """Stable id of the Google account, unlike the token which changes on refresh."""
+    about = drive.about().get(fields="user(permissionId)").execute(num_retries=3)
+    return about["user"]["permissionId"]
+
+
+def _drive_cache_lookup(
+    google_token: str, files: list[tuple[str, str]]
+) -> tuple[str, str]:
+    """Return the account id and the revision of the (name, mime type) files.
+
+    Each file is looked up with the same query as the export and the first
+    match is taken, as the export does, so the fingerprint is of the file the
+    run would export. Metadata only, nothing is downloaded. Blocking (token
+    refresh and Drive calls), run it in a thread.
+    """
+    drive = _drive_service(google_token)
+    matches = []
+    for file_name, mime_type in files:
+        resp = (
+            drive.files()
+            .list(
+                q=_drive_file_query(file_name, mime_type),
+                spaces="drive",
+                fields="files(id, modifiedTime)",
+                supportsAllDrives=True,
+                includeItemsFromAllDrives=True,
+            )
+            .execute(num_retries=3)
+        )
+        if not resp.get("files"):
+            raise FileNotFoundError(f"'{file_name}' not found on Google Drive")
+        matches.append((resp["files"][0]["id"], resp["files"][0].get("modifiedTime")))
+    return _drive_account_id(drive), _drive_revision(matches)
+
+
+def _response_cache_key(
+    control_info: ControlInfo,
+    account_id: str,
+    sheet_name: str,
+    context_document_name: str,
+    goal: str,
+    revision: str,
+) -> str:
+    # Outputs are never shared across customers, entities or Google accounts
+    return hashlib.blake2b(
+        "\x1f".join(
+            [
+                str(control_info.customer_id),
+                str(control_info.entity_id),
+                account_id,
+                goal,
+                sheet_name,
+                context_document_name,
+                revision,
+            ]
+        ).encode("utf-8"),
+        digest_size=16,
+    ).hexdigest()
+
+
+def _restore_cached_output(
+    output: CustomQuestionnaireAssistantV2Output, working_dir: str
+) -> CustomQuestionnaireAssistantV2Output | None:
+    """Copy the files of a cached output into working_dir and repoint the output at them.
+
+    The cached files stay in the working dir of the run that produced them, the
+    control execution folder, which a rerun keeps: it only removes the action
+    subfolders. Returns None if any of them is gone anyway, so the caller does a
+    real run instead.
+    """
+    copied: dict[str, str] = {}
+    for src in [output.processed_result.file_path, *(e.path for e in output.evidence)]:
+        if src in copied:
+            continue
+        if not os.path.isfile(src):
+            return None
+        dst = pathlib.Path(working_dir) / pathlib.Path(src).name
+        try:
+            if dst.resolve() != pathlib.Path(src).resolve():
+                shutil.copy2(src, dst)
+        except OSError as e:
+            # Deleted between the check and the copy
+            logfire.warning(f"Could not restore cached file {src}: {e}")
+            return None
+        copied[src] = str(dst)
+
+    return output.model_copy(
+        update={
+            "processed_result": output.processed_result.model_copy(
+                update={"file_path": copied[output.processed_result.file_path]}
+            ),
+            "evidence": [
+                e.model_copy(update={"path": copied[e.path]}) for e in output.evidence
+            ],
+        }
+    )
+
+
+def _mcp_result(result):
+    # FastMCP wraps non-object return values (e.g. lists) in {"result": ...}
+    if isinstance(result, dict) and set(result) == {"result"}:
+        return result["result"]
+    return result
+
+
+async def _find_drive_file(
+    server: MCPServerStdio, file_name: str, mime_type: str
+) -> dict:
+    files = _mcp_result(
+        await server.direct_call_tool(
+            "list_files", {"query": _drive_file_query(file_name, mime_type)}
+        )
+    )
+    if not files:
+        raise FileNotFoundError(f"'{file_name}' not found on Google Drive")
+    return files[0]
+
+
+async def _export_drive_file(
+    server: MCPServerStdio, tool_name: str, file_id: str, export_format: str
+) -> pathlib.Path:
+    exported = _mcp_result(
+        await server.direct_call_tool(
+            tool_name, {"file_id": file_id, "format": export_format}
+        )
+    )
+    if "error" in exported:
+        raise RuntimeError(f"{tool_name} failed: {exported['error']}")
+    return pathlib.Path(exported["saved_path"])
+
+
+async def prefetch_inputs(
+    server: MCPServerStdio,
+    deps: CustomQuestionnaireAssistantV2AgentDeps,
+    sheet_name: str,
+    context_document_name: str,
+) -> tuple[str, str, str]:
+    """Export and load the sheet and context document without going through the LLM.
+
+    Both files are looked up, exported and read concurrently. Returns the
+    (masked) sheet and document content to hand to the agent, and the Drive
+    revision of the exported files.
+    """
+    sheet, document = await asyncio.gather(
+        _find_drive_file(server, sheet_name, SPREADSHEET_MIME_TYPE),
+        _find_drive_file(server, context_document_name, DOCUMENT_MIME_TYPE),
+    )
+    sheet_path, document_path = await asyncio.gather(
+        _export_drive_file(server, "export_spreadsheet", sheet["id"], "xlsx"),
+        _export_drive_file(server, "export_document", document["id"], "txt"),
+    )
+    sheet_view, document_view = await asyncio.gather(
+        _load_excel_file(
+            deps, _resolve_and_guard_path(str(sheet_path), deps.working_dir)
+        ),
+        _load_context_document(
+            deps, _resolve_and_guard_path(str(document_path), deps.working_dir)
+        ),
+    )
+    revision = _drive_revision(
+        [
+            (sheet["id"], sheet.get("modified_time")),
+            (document["id"], document.get("modified_time")),
+        ]
+    )
+    return sheet_view, document_view, revision
+
+
+# Tool schemas are generated once here and shared by every agent using them
+QUESTIONNAIRE_ASSISTANT_V2_TOOLS = [
+    Tool(read_excel_file, takes_ctx=True, max_retries=5),
+    Tool(read_context_document, takes_ctx=True, max_retries=5),
+    Tool(get_observation, takes_ctx=True, max_retries=5),
+    Tool(update_existing_cells, takes_ctx=True, max_retries=5),
+    Tool(add_new_column, takes_ctx=True, max_retries=5),
+]
+
+
+QUESTIONNAIRE_ASSISTANT_V2_AGENT = Agent(
+    model=get_pydanticai_openai_llm(),
+    deps_type=CustomQuestionnaireAssistantV2AgentDeps,
+    output_type=CustomQuestionnaireAssistantV2Output,
+    system_prompt=[
+        CUSTOM_QUESTIONNAIRE_ASSISTANT_V2_PROMPT,
+        CUSTOM_QUESTIONNAIRE_ASSISTANT_V2_TASK_PROMPT,
+    ],
+    tools=QUESTIONNAIRE_ASSISTANT_V2_TOOLS,
+)
+
+
 async def custom_questionnaire_assistant_v2(
     ctx: RunContext[ActionDeps],
     google_token: str,
@@ -394,29 +818,51 @@ async def custom_questionnaire_assistant_v2(
 ) -> CustomQuestionnaireAssistantV2Output:
 
     try:
-        refreshed_credentials_json = get_refreshed_credentials_json(google_token)
-        google_drive_mcp_server = MCPServerStdio(
-            command="uv",
-            args=["run", "python", "-m", "mcp_server.google_drive.server"],
-            env={
-                "GOOGLE_CREDENTIALS": refreshed_credentials_json,
-                "LOGFIRE_TOKEN": os.environ["LOGFIRE_TOKEN"],
-                "LOGFIRE_SERVICE_NAME": os.environ["LOGFIRE_SERVICE_NAME"],
-                "WORKING_DIR": str(pathlib.Path(f"{ctx.deps.working_dir}").resolve()),
-            },
-        )
-        QUESTIONNAIRE_ASSISTANT_AGENT = Agent(
-            model=get_pydanticai_openai_llm(),
-            deps_type=CustomQuestionnaireAssistantV2AgentDeps,
-            output_type=CustomQuestionnaireAssistantV2Output,
-            system_prompt=CUSTOM_QUESTIONNAIRE_ASSISTANT_V2_PROMPT,
-            toolsets=[google_drive_mcp_server],
-            tools=[
-                Tool(read_excel_file, takes_ctx=True, max_retries=5),
-                Tool(read_context_document, takes_ctx=True, max_retries=5),
-                Tool(update_existing_cells, takes_ctx=True, max_retries=5),
-                Tool(add_new_column, takes_ctx=True, max_retries=5),
-            ],
+        account_id = None
+        cached_output = None
+        # Nothing to hit on an empty cache, so skip the Drive lookup
+        if _response_cache:
+            try:
+                account_id, revision = await asyncio.to_thread(
+                    _drive_cache_lookup,
+                    google_token,
+                    [
+                        (sheet_name, SPREADSHEET_MIME_TYPE),
+                        (context_document_name, DOCUMENT_MIME_TYPE),
+                    ],
+                )
+            except Exception as e:
+                logfire.warning(
+                    f"Skipping response cache, Drive revision lookup failed: {e}"
+                )
+            else:
+                cache_key = _response_cache_key(
+                    ctx.deps.control_info,
+                    account_id,
+                    sheet_name,
+                    context_document_name,
+                    goal,
+                    revision,
+                )
+                cached_output = _response_cache.get(cache_key)
+        if cached_output is not None:
+            restored = await asyncio.to_thread(
+                _restore_cached_output, cached_output, ctx.deps.working_dir
+            )
+            if restored is None:
+                # The cached files are gone, do a real run and cache it again
+                _response_cache.pop(cache_key, None)
+            else:
+                logfire.info("Questionnaire response cache hit", cache_key=cache_key)
+                await ctx.deps.add_log(
+                    PlainTextLog(
+                        data="Sheet and context document are unchanged since a previous run, reusing its result"
+                    )
+                )
+                return restored
+
+        google_drive_mcp_server = google_drive_toolset(
+            google_token, ctx.deps.working_dir
         )
 
         # Create deps for the agent with original DataFrame and context content
@@ -426,20 +872,41 @@ async def custom_questionnaire_assistant_v2(
                 "context_document_name": context_document_name,
                 "goal": goal,
                 "original_dataframe": None,
+                "pending_columns": [],
                 "context_content": "",
+                "observations": {},
             }
         )
         try:
-            result = await QUESTIONNAIRE_ASSISTANT_AGENT.run(
-                f"""
-                1. There is a sheet on the google drive called {sheet_name}, you have to export it to a xlsx file.
-                2. There is a context document on the google drive called {context_document_name}, you have to export it to a txt file.
-                3. After exporting the files, you have to read the sheet and the context document to import the content into the dependencies.
-                4. Then, you have to use update_existing_cells or add_new_column to answer the questions in the spreadsheet based on the context document.
-                Goal: {goal}
-                """,
-                deps=deps,  # Available for future tool access if needed (currently not used)
-            )
+            async with google_drive_mcp_server:
+                # Only the per-run values go into the user message, after the static prefix
+                user_prompt = (
+                    f"Sheet name: {sheet_name}\n"
+                    f"Context document name: {context_document_name}\n"
+                    f"Goal: {goal}"
+                )
+                revision = None
+                try:
+                    sheet_view, document_view, revision = await prefetch_inputs(
+                        google_drive_mcp_server,
+                        deps,
+                        sheet_name,
+                        context_document_name,
+                    )
+                    user_prompt += (
+                        "\n\nBoth files are already exported and loaded, skip the export and read steps.\n\n"
+                        f"Sheet content:\n{sheet_view}\n\n"
+                        f"Context document content:\n{document_view}"
+                    )
+                except Exception as e:
+                    # Fall back to letting the agent export and read the files itself
+                    logfire.warning(f"Prefetching questionnaire inputs failed: {e}")
+
+                result = await QUESTIONNAIRE_ASSISTANT_V2_AGENT.run(
+                    user_prompt,
+                    deps=deps,  # Available for future tool access if needed (currently not used)
+                    toolsets=[google_drive_mcp_server],
+                )
         except* HTTPStatusError as eg:
             for err in eg.exceptions:  # type: HTTPStatusError
                 await ctx.deps.add_log(
@@ -454,6 +921,28 @@ async def custom_questionnaire_assistant_v2(
             PlainTextLog(data="Successfully completed spreadsheet processing")
         )
 
+        # Only cached when the revision of the exported files is known
+        if revision is not None:
+            try:
+                if account_id is None:
+                    account_id = await asyncio.to_thread(
+                        lambda: _drive_account_id(_drive_service(google_token))
+                    )
+            except Exception as e:
+                logfire.warning(f"Not caching response, account lookup failed: {e}")
+            else:
+                cache_key = _response_cache_key(
+                    ctx.deps.control_info,
+                    account_id,
+                    sheet_name,
+                    context_document_name,
+                    goal,
+                    revision,
+                )
+                if len(_response_cache) >= _RESPONSE_CACHE_MAXSIZE:
+                    _response_cache.pop(next(iter(_response_cache)))
+                _response_cache[cache_key] = result.output
+
         return result.output
 
     except Exception as e:
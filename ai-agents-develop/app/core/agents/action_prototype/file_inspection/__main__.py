@@ -4,7 +4,10 @@ import logfire
 from pydantic_ai import Agent, Tool
 
 from app.core.agents.action_prototype.file_inspection.schema import FileInspectionOutput
-from app.core.agents.action_prototype.file_inspection.tools import file_process
+from app.core.agents.action_prototype.file_inspection.tools import (
+    close_file_process_session,
+    file_process,
+)
 from app.core.graph.deps.action_deps import ActionDeps
 from app.core.graph.deps.base_deps import ControlInfo
 from app.core.llm.pydanticai.openai_model import get_pydanticai_openai_llm
@@ -35,11 +38,15 @@ async def main():
         tools=[Tool(file_process, takes_ctx=True)],
     )
 
-    result = await agent.run(
-        f"Can you tell me do they contain some similar information in these two files: {files}",
-        deps=deps,
-    )
-    await deps.dispose()
+    try:
+        result = await agent.run(
+            f"Can you tell me do they contain some similar information in these two files: {files}",
+            deps=deps,
+        )
+    finally:
+        # file_process keeps its container open for the whole run
+        await close_file_process_session(deps.working_dir)
+        await deps.dispose()
     return result
 
 
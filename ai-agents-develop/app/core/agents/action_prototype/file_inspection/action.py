@@ -1,15 +1,22 @@
+import asyncio
 from dataclasses import dataclass
 
 import logfire
 from alltrue.agents.schema.action_execution import ActionExecutionStatus
 from pydantic_ai import Agent
+from pydantic_ai.agent import AgentRun, ModelRequestNode
+from pydantic_ai.messages import PartStartEvent, ToolCallPart
 from pydantic_graph import BaseNode, GraphRunContext
 
 from app.core.agents.action_prototype.file_inspection.schema import (
     FileInspectionDeps,
     FileInspectionOutput,
 )
-from app.core.agents.action_prototype.file_inspection.tools import file_process
+from app.core.agents.action_prototype.file_inspection.tools import (
+    close_file_process_session,
+    file_process,
+    run_file_process,
+)
 from app.core.graph.deps.graph_deps import GraphDeps, patched_action_deps
 from app.core.graph.state.state import State
 from app.core.llm.pydanticai.openai_model import get_pydanticai_openai_llm
@@ -19,28 +26,7 @@ class FileInspectionNodeException(Exception):
     """Custom exception raised for errors in the file inspection node."""
 
 
-@dataclass
-class FileInspection(BaseNode[State]):
-    async def run(self, ctx: GraphRunContext[State, GraphDeps]) -> BaseNode:
-        logfire.info("Running file inspection action")
-        # Update the action status to running
-        action_deps = ctx.deps.get_action_deps()
-
-        action_deps.update_action_status(ActionExecutionStatus.IN_PROGRESS)
-        try:
-            current_deps = FileInspectionDeps.model_validate(
-                ctx.deps.get_current_deps()
-            )
-            logfire.info(f"Input: {current_deps}")
-
-            async with patched_action_deps(ctx, action_deps) as new_ctx:
-                agent = Agent(
-                    model=get_pydanticai_openai_llm(),
-                    tools=[file_process],
-                    deps_type=FileInspectionDeps,
-                    deps=current_deps,
-                    output_type=FileInspectionOutput,
-                    system_prompt="""
+FILE_INSPECTION_SYSTEM_PROMPT = """
                     You will receive a list of files.
                     Your tasks are:
 
@@ -55,8 +41,71 @@ class FileInspection(BaseNode[State]):
                     If you receive any unclear or ambiguous filenames, ask for clarification.
 
                     Output should follow the required output schema.
-                    """,
-                )
+                    """
+
+FILE_INSPECTION_AGENT = Agent(
+    model=get_pydanticai_openai_llm(),
+    tools=[file_process],
+    deps_type=FileInspectionDeps,
+    output_type=FileInspectionOutput,
+    system_prompt=FILE_INSPECTION_SYSTEM_PROMPT,
+)
+
+
+async def _stream_and_start_file_process(
+    node: ModelRequestNode,
+    agent_run: AgentRun,
+    deps: FileInspectionDeps,
+    early_tasks: dict[str, asyncio.Task],
+) -> None:
+    """
+    Stream the model response and start each file_process call as soon as its part is complete.
+
+    The agent only executes tools once the whole response has been generated, so
+    without this the container sits idle while the model is still writing the
+    remaining calls. The tool call itself later picks up the result from the
+    file_process session.
+    """
+    async with node.stream(agent_run.ctx) as request_stream:
+        async for event in request_stream:
+            if not isinstance(event, PartStartEvent):
+                continue
+            # A new part starting means every part before it is complete
+            for part in request_stream.get().parts[: event.index]:
+                if (
+                    not isinstance(part, ToolCallPart)
+                    or part.tool_name != file_process.__name__
+                    or part.tool_call_id in early_tasks
+                ):
+                    continue
+                try:
+                    args = part.args_as_dict()
+                    task = run_file_process(
+                        deps.working_dir, args["file_path_list"], args["instructions"]
+                    )
+                except Exception:
+                    # Malformed arguments are left to the tool call validation
+                    continue
+                early_tasks[part.tool_call_id] = asyncio.create_task(task)
+
+
+@dataclass
+class FileInspection(BaseNode[State]):
+    async def run(self, ctx: GraphRunContext[State, GraphDeps]) -> BaseNode:
+        logfire.info("Running file inspection action")
+        # Update the action status to running
+        action_deps = ctx.deps.get_action_deps()
+
+        # Awaited before the agent starts: the status write and the log writes all
+        # read-modify-write the same ActionExecution, so they must not interleave
+        await action_deps.update_action_status(ActionExecutionStatus.IN_PROGRESS)
+        try:
+            current_deps = FileInspectionDeps.model_validate(
+                ctx.deps.get_current_deps()
+            )
+            logfire.info("Input: {input}", input=current_deps)
+
+            async with patched_action_deps(ctx, action_deps) as new_ctx:
                 user_prompt = f"""
                 You are a helpful assistant that process the files based on the requirements from the users.
                 The files are:
@@ -65,15 +114,30 @@ class FileInspection(BaseNode[State]):
                 {current_deps.instructions}
 
                 """
-                res = await agent.run(user_prompt, deps=new_ctx.deps)
-            logfire.info(f"Result: {res}")
-
-            result = FileInspectionOutput.model_validate(res)
-            result = result.model_dump()
+                early_tasks: dict[str, asyncio.Task] = {}
+                try:
+                    async with FILE_INSPECTION_AGENT.iter(
+                        user_prompt, deps=new_ctx.deps
+                    ) as agent_run:
+                        async for node in agent_run:
+                            if Agent.is_model_request_node(node):
+                                await _stream_and_start_file_process(
+                                    node, agent_run, new_ctx.deps, early_tasks
+                                )
+                    res = agent_run.result
+                finally:
+                    for task in early_tasks.values():
+                        task.cancel()
+                    await asyncio.gather(*early_tasks.values(), return_exceptions=True)
+                    await close_file_process_session(new_ctx.deps.working_dir)
+            logfire.info("Result: {output}", output=res.output)
+
+            # The agent output is already a validated FileInspectionOutput
+            result = res.output.model_dump()
             ctx.state.store_output(result)
 
             # Update the action status to success, also store the output
-            action_deps.update_action_status(
+            await action_deps.update_action_status(
                 ActionExecutionStatus.PASSED, output=result
             )
 
@@ -81,7 +145,9 @@ class FileInspection(BaseNode[State]):
 
         except Exception as e:
             logfire.error(f"Error in File inspectio action: {e}")
-            action_deps.update_action_status(ActionExecutionStatus.FAILED, error=str(e))
+            await action_deps.update_action_status(
+                ActionExecutionStatus.FAILED, error=str(e)
+            )
             raise FileInspectionNodeException(
                 f"File inspection Node failed: {e}"
             ) from e
@@ -1,8 +1,13 @@
+import asyncio
+import hashlib
+from dataclasses import dataclass, field
+from pathlib import Path
+
 import logfire
-from pydantic_ai import RunContext
+from pydantic_ai import ModelRetry, RunContext
 
 from app.core.agents.utils.openai_utils.response_with_tool_code_interpreter import (
-    run_code_with_container,
+    CodeInterpreterResponseManager,
 )
 from app.core.graph.deps.base_deps import BaseDeps
 
@@ -13,6 +18,56 @@ I need you to do the following tasks for the files provided:
 {instructions}
 """
 
+# The code interpreter keeps its Python state for the lifetime of the container,
+# which is shared by all file_process calls of one file inspection run.
+file_cache_prelude = """
+Files parsed in earlier tasks are kept in the global dict `_FILE_CACHE`, keyed by file path, as (os.path.getmtime(path), parsed object) tuples. Create `_FILE_CACHE = {}` if it does not exist yet.
+Before parsing a file (e.g. with pandas.read_csv or pandas.read_excel), reuse the cached object if the modification time still matches, and store every file you parse in `_FILE_CACHE`.
+"""
+
+
+@dataclass
+class FileProcessSession:
+    """Code interpreter container shared by the file_process calls of one run."""
+
+    manager: CodeInterpreterResponseManager
+    # Guards the container start and the upload/download bookkeeping; the code
+    # execution itself runs outside of it
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    # Local file path -> (mtime_ns, container file id) of files already uploaded
+    uploaded_files: dict[str, tuple[int, str]] = field(default_factory=dict)
+    # Container file path -> container file id already downloaded to the working dir
+    downloaded_files: dict[str, str] = field(default_factory=dict)
+    # Digest of (file fingerprints, instructions) -> task producing that call's output
+    outputs: dict[str, asyncio.Task[str]] = field(default_factory=dict)
+
+
+# Sessions keyed by working dir, closed by close_file_process_session
+_file_process_sessions: dict[str, FileProcessSession] = {}
+
+
+async def close_file_process_session(working_dir: str) -> None:
+    """Delete the container used by file_process for the given working dir."""
+    session = _file_process_sessions.pop(working_dir, None)
+    if session is None:
+        return
+    for task in session.outputs.values():
+        task.cancel()
+    await asyncio.gather(*session.outputs.values(), return_exceptions=True)
+    try:
+        await session.manager.cleanup()
+    except Exception as e:
+        logfire.error(f"Error in deleting container: {e}")
+
+
+def _file_process_key(file_paths: list[Path], instructions: str) -> str:
+    digest = hashlib.sha256()
+    for path in file_paths:
+        stat = path.stat()
+        digest.update(f"{path}\0{stat.st_mtime_ns}\0{stat.st_size}\0".encode("utf-8"))
+    digest.update(instructions.encode("utf-8"))
+    return digest.hexdigest()
+
 
 async def file_process(
     ctx: RunContext[BaseDeps], file_path_list: list[str], instructions: str
@@ -24,16 +79,104 @@ async def file_process(
         file_path_list: The list of file paths to compare, example: ["/Users/john/Downloads/sheet1.xlsx", "/Users/john/Downloads/sheet2.xlsx"]
         instructions: The instructions for the comparison
 
+    """
+    return await run_file_process(ctx.deps.working_dir, file_path_list, instructions)
+
+
+async def run_file_process(
+    working_dir: str, file_path_list: list[str], instructions: str
+) -> str:
+    """
+    Run one file_process task in the working dir's code interpreter container.
+
+    Calls of one session run concurrently. Identical calls share the task in the
+    session outputs, so a task started ahead of the tool call (see FileInspection)
+    is not executed twice.
     """
     logfire.info(
-        f"Working dir: {ctx.deps.working_dir}, File path list: {file_path_list}, Instructions: {instructions}"
+        "Working dir: {working_dir}, File path list: {file_path_list}, Instructions: {instructions}",
+        working_dir=working_dir,
+        file_path_list=file_path_list,
+        instructions=instructions,
     )
-    # only support two files comparison
-    output = await run_code_with_container(
-        ctx.deps.working_dir,
-        file_path_list,
-        instruction_template.format(instructions=instructions),
-        container_name="file-inspection",  # TODO: use different container for each control execution, currently, we reuse the same container to save money.
+    file_paths = []
+    for f in file_path_list:
+        file_path = Path(f)
+        if not file_path.exists():
+            raise ModelRetry(f"File {file_path} not found")
+        file_paths.append(file_path)
+
+    session = _file_process_sessions.get(working_dir)
+    if session is None:
+        # TODO: use different container for each control execution, currently, we reuse the same container to save money.
+        session = FileProcessSession(
+            CodeInterpreterResponseManager("file-inspection", auto_cleanup=False)
+        )
+        _file_process_sessions[working_dir] = session
+
+    key = _file_process_key(file_paths, instructions)
+    task = session.outputs.get(key)
+    if task is None:
+        task = asyncio.create_task(
+            _execute_file_process(session, working_dir, file_paths, instructions)
+        )
+        session.outputs[key] = task
+    else:
+        logfire.info("Reusing file_process output for identical files and instructions")
+    try:
+        # Shielded, a cancelled caller does not cancel the task other callers share
+        return await asyncio.shield(task)
+    except Exception:
+        # Failed calls are not reused, the next identical call runs again
+        if task.done() and session.outputs.get(key) is task:
+            del session.outputs[key]
+        raise
+
+
+async def _execute_file_process(
+    session: FileProcessSession,
+    working_dir: str,
+    file_paths: list[Path],
+    instructions: str,
+) -> str:
+    async with session.lock:
+        await session.manager.start()
+        # Only upload files that are new or changed since the last call
+        to_upload = [
+            path
+            for path in file_paths
+            if session.uploaded_files.get(str(path), (None,))[0]
+            != path.stat().st_mtime_ns
+        ]
+        if to_upload:
+            file_ids = await session.manager.upload_files(to_upload)
+            for path, file_id in zip(to_upload, file_ids):
+                session.uploaded_files[str(path)] = (path.stat().st_mtime_ns, file_id)
+
+    resp = await session.manager.execute_code(
+        file_cache_prelude + instruction_template.format(instructions=instructions),
+        verbosity=None,
+        effort=None,
     )
+    if resp.status != "completed":
+        raise Exception(f"Response status: {resp.status}")
+    output = resp.output_text
+    logfire.info(f"Output: {output}")
+
+    async with session.lock:
+        uploaded_file_ids = {file_id for _, file_id in session.uploaded_files.values()}
+        # Files generated by earlier calls are only downloaded again if replaced
+        for file_info in await session.manager.list_files():
+            if (
+                file_info["id"] in uploaded_file_ids
+                or session.downloaded_files.get(file_info["path"]) == file_info["id"]
+            ):
+                continue
+            await session.manager.download_file(
+                destination_dir=working_dir,
+                custom_name=file_info["name"],
+                file_id=file_info["id"],
+            )
+            session.downloaded_files[file_info["path"]] = file_info["id"]
 
     return output
@@ -6,7 +6,6 @@ from pydantic_graph import BaseNode, GraphRunContext
 
 from app.core.agents.action_prototype.general_browser.schema import (
     GeneralBrowserDeps,
-    GeneralBrowserOutput,
 )
 from app.core.agents.action_prototype.general_browser.tool import general_browser
 from app.core.graph.deps.graph_deps import GraphDeps, patched_action_deps
@@ -24,13 +23,15 @@ class GeneralBrowser(BaseNode[State]):
         # Update the action status to running
         action_deps = ctx.deps.get_action_deps()
 
-        action_deps.update_action_status(ActionExecutionStatus.IN_PROGRESS)
+        # Awaited before the agent starts: the status write and the log writes all
+        # read-modify-write the same ActionExecution, so they must not interleave
+        await action_deps.update_action_status(ActionExecutionStatus.IN_PROGRESS)
 
         try:
             current_deps = GeneralBrowserDeps.model_validate(
                 ctx.deps.get_current_deps()
             )
-            logfire.info(f"Input: {current_deps}")
+            logfire.info("Input: {input}", input=current_deps)
 
             # === logic ===
             async with patched_action_deps(ctx, action_deps) as new_ctx:
@@ -43,19 +44,21 @@ class GeneralBrowser(BaseNode[State]):
                 )
             # ==== end logic ====
 
-            result = GeneralBrowserOutput.model_validate(res)
-            result = result.model_dump()
+            # general_browser already returns a dumped GeneralBrowserOutput
+            result = res
             ctx.state.store_output(result)
 
             # Update the action status to success, also store the output
-            action_deps.update_action_status(
+            await action_deps.update_action_status(
                 ActionExecutionStatus.PASSED, output=result
             )
-            logfire.info(f"Output: {ctx.state.output}")
+            logfire.info("Output: {output}", output=result)
 
             return await ctx.deps.get_next_node()
 
         except Exception as e:
             logfire.error(f"Error in GeneralBrowser action: {e}")
-            action_deps.update_action_status(ActionExecutionStatus.FAILED, error=str(e))
+            await action_deps.update_action_status(
+                ActionExecutionStatus.FAILED, error=str(e)
+            )
             raise GeneralBrowserNodeException(f"GeneralBrowser Node failed: {e}") from e
@@ -9,12 +9,17 @@
 #  Dissemination of this information or reproduction of this material
 #  is strictly forbidden unless prior written permission is obtained
 #  from AllTrue.ai Incorporated.
+import asyncio
 from typing import List, Literal
 
+import logfire
 from pydantic import BaseModel
 from pydantic_ai import Agent
 
+from app.core.agents.utils.html_reduce import reduce_html
+from app.core.llm.cache import cached_agent_run
 from app.core.llm.pydanticai.openai_model import get_pydanticai_openai_llm
+from app.core.llm.retry import LLM_CALL_TIMEOUT_SECONDS, run_agent_with_retry
 
 
 class AuditToolException(Exception):
@@ -29,8 +34,7 @@ class AuditResult(BaseModel):
     evidence: List[str]
 
 
-async def audit_page(page_content: str, instructions: str) -> AuditResult:
-    agent_system_prompt = f"""
+AUDIT_PAGE_SYSTEM_PROMPT = """
         You are an AI agent. Your job is to analyze the page and determine if the page fits the audit requirements.
 
         When making a decision, please provide clear and obvious evidence (could be a text or an element) to support your choice. The evidence should be in this format: "Scroll to <evidence_location>, it shows <evidence>". So that it can be easily located by scrolling up and down and easy to understand what should be checked. Ensure that the evidence_location is on the page.
@@ -42,17 +46,142 @@ async def audit_page(page_content: str, instructions: str) -> AuditResult:
         4. If the page does not contain any information the instructions claim it should have, set the `has_info` field to "no" and return it. Otherwise, `has_info` should always be "yes".
         5. In the `reason` field, provide a brief explanation of why the issue was detected or not detected. For example, "The pull request is related to issue #13" or "No issue was found in the pull request", respectively.
         """
-    agent = Agent(
-        model=get_pydanticai_openai_llm(),
-        system_prompt=agent_system_prompt,
-        output_type=AuditResult,
-    )
-    user_prompt = f"""
+
+AUDIT_PAGE_AGENT = Agent(
+    model=get_pydanticai_openai_llm(),
+    system_prompt=AUDIT_PAGE_SYSTEM_PROMPT,
+    output_type=AuditResult,
+)
+
+
+def _audit_user_prompt(page_content: str, instructions: str) -> str:
+    return f"""
         The HTML Source of the page:
-        {page_content}
+        {reduce_html(page_content)}
         Instructions:
         {instructions}
         """
-    result = await agent.run(user_prompt)
-    output = AuditResult.model_validate(result.output)
-    return output
+
+
+async def audit_page(page_content: str, instructions: str) -> AuditResult:
+    user_prompt = _audit_user_prompt(page_content, instructions)
+
+    async def run() -> AuditResult:
+        result = await run_agent_with_retry(AUDIT_PAGE_AGENT, user_prompt)
+        return result.output
+
+    return await cached_agent_run(
+        page_content.encode("utf-8") + b"\0" + instructions.encode("utf-8"),
+        run,
+        model_name=AUDIT_PAGE_AGENT.model.model_name,
+    )
+
+
+# Upper bound on audit requests in flight at once, to stay under provider rate limits
+AUDIT_CONCURRENCY = 8
+
+
+async def audit_pages_concurrent(
+    pages: List[tuple[str, str]], concurrency: int = AUDIT_CONCURRENCY
+) -> List[AuditResult]:
+    """Audit (page_content, instructions) pairs with one request per page, at most concurrency at a time."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def audit_one(page_content: str, instructions: str) -> AuditResult:
+        async with semaphore:
+            return await audit_page(page_content, instructions)
+
+    return list(
+        await asyncio.gather(
+            *(
+                audit_one(page_content, instructions)
+                for page_content, instructions in pages
+            )
+        )
+    )
+
+
+class NumberedAuditResult(AuditResult):
+    audit_number: int
+
+
+class AuditBatchMismatchException(AuditToolException):
+    """Raised when a batched audit does not return exactly one result per audit."""
+
+
+AUDIT_PAGES_BATCH_SYSTEM_PROMPT = AUDIT_PAGE_SYSTEM_PROMPT + """
+        You will be given several numbered audits, grouped under the page they apply to; a page may have more than one audit. Run every audit independently against its own page and return one result per audit, with the number of the audit in the `audit_number` field.
+        """
+
+AUDIT_PAGES_BATCH_AGENT = Agent(
+    model=get_pydanticai_openai_llm(),
+    system_prompt=AUDIT_PAGES_BATCH_SYSTEM_PROMPT,
+    output_type=List[NumberedAuditResult],
+)
+
+
+def _order_batch_results(
+    outputs: List[NumberedAuditResult], audits_count: int
+) -> List[AuditResult]:
+    """Put the results in audit order, matched by audit_number rather than position."""
+    by_number = {output.audit_number: output for output in outputs}
+    if len(outputs) != audits_count or set(by_number) != set(
+        range(1, audits_count + 1)
+    ):
+        raise AuditBatchMismatchException(
+            f"Batched audit returned audit numbers {sorted(by_number)} for {audits_count} audits"
+        )
+    return [by_number[audit_number] for audit_number in range(1, audits_count + 1)]
+
+
+async def audit_pages_batch(pages: List[tuple[str, str]]) -> List[AuditResult]:
+    """Audit several (page_content, instructions) pairs with a single model call."""
+    if not pages:
+        return []
+    if len(pages) == 1:
+        return [await audit_page(*pages[0])]
+
+    # Audits of the same page share one copy of its HTML in the prompt
+    audits_by_page: dict[str, List[tuple[int, str]]] = {}
+    for audit_number, (page_content, instructions) in enumerate(pages, start=1):
+        audits_by_page.setdefault(page_content, []).append((audit_number, instructions))
+    sections = []
+    for page_number, (page_content, audits) in enumerate(
+        audits_by_page.items(), start=1
+    ):
+        audit_lines = "\n".join(f"""
+        Audit {audit_number} instructions:
+        {instructions}""" for audit_number, instructions in audits)
+        sections.append(f"""
+        Page {page_number}:
+        The HTML Source of the page:
+        {reduce_html(page_content)}
+        {audit_lines}
+        """)
+    user_prompt = (
+        f"You will run {len(pages)} audits on {len(audits_by_page)} pages.\n"
+        + "\n---\n".join(sections)
+    )
+
+    async def run() -> List[AuditResult]:
+        # The deadline grows with the number of pages in the prompt
+        result = await run_agent_with_retry(
+            AUDIT_PAGES_BATCH_AGENT,
+            user_prompt,
+            timeout=LLM_CALL_TIMEOUT_SECONDS * len(pages),
+        )
+        # Raised inside run, so a mismatched output is never cached
+        return _order_batch_results(result.output, len(pages))
+
+    try:
+        return await cached_agent_run(
+            b"\0\0".join(
+                page_content.encode("utf-8") + b"\0" + instructions.encode("utf-8")
+                for page_content, instructions in pages
+            ),
+            run,
+            model_name=AUDIT_PAGES_BATCH_AGENT.model.model_name,
+        )
+    except AuditBatchMismatchException as e:
+        logfire.warning(f"{e}, auditing pages one by one")
+        return await audit_pages_concurrent(pages)
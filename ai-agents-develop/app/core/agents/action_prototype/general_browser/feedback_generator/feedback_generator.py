@@ -1,9 +1,12 @@
-import base64
+import asyncio
 
-import logfire
 from pydantic import BaseModel
 from pydantic_ai import Agent, BinaryContent
 
+from app.core.agents.action_prototype.screenshot.image_process.vision_image import (
+    prepare_vision_image,
+)
+from app.core.llm.cache import cached_agent_run
 from app.core.llm.pydanticai.openai_model import get_pydanticai_openai_llm
 
 
@@ -11,11 +14,7 @@ class FeedbackInfo(BaseModel):
     new_feedback: str
 
 
-# target_content: "in the label section, thereis no pri"
-async def get_real_feedback(
-    original_feedback: str, screenshot: str, user_prompt: str
-) -> str:
-    agent_system_prompt = f"""
+FEEDBACK_SYSTEM_PROMPT = """
         You are responsible for writing feedback to a user to help them improve their instructions to an AI Agent that got stuck during its task. You will be given:
 
         The instructions the user provided to the agent,
@@ -28,27 +27,40 @@ async def get_real_feedback(
 
         Use the screenshot to analyze what UI elements are visible or hidden, and what the agent might have overlooked. Your feedback should help the user write more robust instructions that guide the agent through such situations.
         """
-    agent = Agent(
-        model=get_pydanticai_openai_llm(),
-        system_prompt=agent_system_prompt,
-        output_type=FeedbackInfo,
+
+FEEDBACK_AGENT = Agent(
+    model=get_pydanticai_openai_llm(),
+    system_prompt=FEEDBACK_SYSTEM_PROMPT,
+    output_type=FeedbackInfo,
+)
+
+
+# target_content: "in the label section, thereis no pri"
+async def get_real_feedback(
+    original_feedback: str, screenshot: bytes | None, user_prompt: str
+) -> str:
+    async def run() -> str:
+        if screenshot:
+            image, media_type = await asyncio.to_thread(
+                prepare_vision_image, screenshot
+            )
+            input_prompt = [
+                f"The original feedback is: \n {original_feedback}. \n And the original user prompt input is: \n {user_prompt} \n The screenshot of the failed webpage is as follows: \n"
+            ]
+            input_prompt.append(BinaryContent(data=image, media_type=media_type))
+        else:
+            input_prompt = [
+                f"The original feedback is: \n {original_feedback}. \n And the original user prompt input is: \n {user_prompt}"
+            ]
+        result = await FEEDBACK_AGENT.run(input_prompt)
+        return result.output.new_feedback
+
+    return await cached_agent_run(
+        original_feedback.encode("utf-8")
+        + b"\0"
+        + user_prompt.encode("utf-8")
+        + b"\0"
+        + (screenshot or b""),
+        run,
+        model_name=FEEDBACK_AGENT.model.model_name,
     )
-    if screenshot:
-        try:
-            image_bytes = base64.b64decode(screenshot)
-        except Exception as e:
-            logfire.warning(f"Error decoding screenshot")
-            image_bytes = None
-
-    if image_bytes:
-        input_prompt = [
-            f"The original feedback is: \n {original_feedback}. \n And the original user prompt input is: \n {user_prompt} \n The screenshot of the failed webpage is as follows: \n"
-        ]
-        input_prompt.append(BinaryContent(data=image_bytes, media_type="image/png"))
-    else:
-        input_prompt = [
-            f"The original feedback is: \n {original_feedback}. \n And the original user prompt input is: \n {user_prompt}"
-        ]
-
-    result = await agent.run(input_prompt)
-    return FeedbackInfo.model_validate(result.output).new_feedback
@@ -10,12 +10,20 @@
 #  is strictly forbidden unless prior written permission is obtained
 #  from AllTrue.ai Incorporated.
 
+import asyncio
 from typing import Literal
 
 from pydantic import BaseModel
 from pydantic_ai import Agent, BinaryContent
 
+from app.core.agents.action_prototype.screenshot.image_process.vision_image import (
+    difference_hash,
+    prepare_vision_image,
+)
+from app.core.agents.utils.html_reduce import reduce_html
+from app.core.llm.cache import cached_agent_run
 from app.core.llm.pydanticai.openai_model import get_pydanticai_openai_llm
+from app.core.llm.retry import run_agent_with_retry
 
 
 class ScreenshotInfoResult(BaseModel):
@@ -23,11 +31,7 @@ class ScreenshotInfoResult(BaseModel):
     reason: str
 
 
-# target_content: "in the label section, thereis no pri"
-async def filter_relevant_screenshots(
-    page_content: str, target_information: str, screenshot: bytes
-) -> Literal["yes", "no"]:
-    agent_system_prompt = f"""
+SCREENSHOT_INFO_SYSTEM_PROMPT = """
         You are an AI agent. Your job is to read the HTML source and the screenshot of a web page and determine if a specific piece of information appears anywhere in the page.
 
         If the information is present, set the `include_info` flag to "yes" and return it.
@@ -38,16 +42,37 @@ async def filter_relevant_screenshots(
 
         But you also need to provide a reason for your decision in the `reason` field why you think the information is present or not.
         """
-    agent = Agent(
-        model=get_pydanticai_openai_llm(),
-        system_prompt=agent_system_prompt,
-        output_type=ScreenshotInfoResult,
-    )
-    user_prompt = [f" \n HTML Source is: \n{{{page_content}}}"]
-    user_prompt.append(BinaryContent(data=screenshot, media_type="image/png"))
-    user_prompt.append(
-        f" \n Information you need to check is: \n{{{target_information}}}"
+
+SCREENSHOT_INFO_AGENT = Agent(
+    model=get_pydanticai_openai_llm(),
+    system_prompt=SCREENSHOT_INFO_SYSTEM_PROMPT,
+    output_type=ScreenshotInfoResult,
+)
+
+
+# target_content: "in the label section, thereis no pri"
+async def filter_relevant_screenshots(
+    page_content: str, target_information: str, screenshot: bytes
+) -> Literal["yes", "no"]:
+    async def run() -> Literal["yes", "no"]:
+        image, media_type = await asyncio.to_thread(prepare_vision_image, screenshot)
+        user_prompt = [f" \n HTML Source is: \n{{{reduce_html(page_content)}}}"]
+        user_prompt.append(BinaryContent(data=image, media_type=media_type))
+        user_prompt.append(
+            f" \n Information you need to check is: \n{{{target_information}}}"
+        )
+        result = await run_agent_with_retry(SCREENSHOT_INFO_AGENT, user_prompt)
+        return result.output.include_info
+
+    # The screenshot is keyed by its perceptual hash, so re-rendering the same page
+    # with pixel-level noise still hits the cache; the HTML keeps content changes apart
+    screenshot_hash = await asyncio.to_thread(difference_hash, screenshot)
+    return await cached_agent_run(
+        page_content.encode("utf-8")
+        + b"\0"
+        + target_information.encode("utf-8")
+        + b"\0dhash:"
+        + screenshot_hash,
+        run,
+        model_name=SCREENSHOT_INFO_AGENT.model.model_name,
     )
-    result = await agent.run(user_prompt)
-    output = ScreenshotInfoResult.model_validate(result.output)
-    return output.include_info
@@ -1,14 +1,22 @@
-from typing import List, Literal, Optional
+import asyncio
+import base64
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from string import Template
+from typing import Any, List, Literal, Optional
 
 import logfire
 from browser_use import ActionResult
 from browser_use import Agent as BrowserUseAgent
 from browser_use import Controller
+from browser_use.browser import BrowserSession
 from pydantic import BaseModel, Field
 from pydantic_ai import RunContext
 
 from app.core.agents.action_prototype.general_browser.audit_tools.audit_detector import (
-    audit_page,
+    audit_pages_batch,
 )
 from app.core.agents.action_prototype.general_browser.feedback_generator.feedback_generator import (
     get_real_feedback,
@@ -19,6 +27,7 @@ from app.core.agents.action_prototype.general_browser.screenshot_detector.screen
 )
 from app.core.agents.action_prototype.generic_auditor_agent.supervisor_tools.browser_info import (
     BrowserInfo,
+    screenshot_digest,
 )
 from app.core.agents.action_prototype.screenshot.image_process.image_spliter import (
     save_blocks_as_images,
@@ -29,8 +38,11 @@ from app.core.agents.action_prototype.screenshot.image_process.screenshot_proces
 from app.core.agents.action_prototype.screenshot.tools import screenshot_action
 from app.core.agents.utils.browser_utils.hook_function import (
     generate_model_output_logs,
-    generate_screenshot_logs,
+    get_history_last_screenshot,
+    get_last_screenshot,
+    upload_screenshot_logs,
 )
+from app.core.agents.utils.browser_utils.log_buffer import StepLogBuffer
 from app.core.graph.deps.base_deps import BaseDeps
 from app.core.llm.browser_use_llm.openai_model import get_browser_use_openai_llm
 
@@ -47,6 +59,79 @@ class BrowserInfoCheckException(Exception):
     """Custom exception raised for errors in browser information checking and auditing."""
 
 
+# Audits requested by the browser agent are collected and sent to the model in
+# one call, flushed at the end of every browser step or once this many pile up.
+AUDIT_BATCH_MAX_SIZE = 8
+
+# Number of (page, check) results remembered per general_browser call
+PAGE_CHECK_CACHE_MAX_SIZE = 128
+
+# Number of page HTML sources remembered per browser step, they can be several MB
+# each
+PAGE_HTML_CACHE_MAX_SIZE = 8
+
+# Screenshot blocks are written to disk here, apart from the default executor
+# used by asyncio.to_thread
+_IMAGE_IO_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="image-io")
+
+# Prompt templates are parsed once at import; only the per-call values are substituted
+TRIED_STEPS_NAVIGATION = 3
+
+TARGET_INFO_SECTION_TEMPLATE = Template(
+    """You also have a task about checking if some information is present and taking screenshots of them: If the instruction requires you to check and take screenshots of some information on some steps, when you are operating that step, check if the information you need is present by using the tool `screenshot_check` with the target information.
+            The target information is:
+            {$target_information}
+            Remember you *MUST* run the tool `screenshot_check` to check if the information is present if the instruction requires it.
+            If the target_information said "take screenshot of something", then you *MUST* use the tool `screenshot_check` when you are operating that step.
+            And you need to generate the input for the tool `screenshot_check` with the target information. The input should not include things like "take screenshot of" or "check if", just the information you need to check or take screenshot of.
+            If the instructions require you to check if the information is in the page, you *MUST* use the tool `screenshot_check` to check if the information is present on the page.
+            On each page, you may run the screenshot_check tool at most once, regardless of how many targets or steps require it, as long as the page has not changed (by navigation, reload, or update).
+            It does not matter how many different targets or steps are requested—never run screenshot_check more than once for the same, unchanged page.
+            Only run screenshot_check again after the page content has changed.
+            """
+)
+
+AUDIT_SECTION_TEMPLATE = Template(
+    """Another task you need to do is to audit the page based on the instructions provided. If the instructions require you to audit, verify, or check some information on the page, you need to use the tool `audit_information` with the instructions.:
+            {$audit_instructions}
+            Remember you *MUST* run the tool `audit_information` to audit the page if the instructions require it in certain steps.
+            Do not run the `audit_information` tool more than once on the same page if the page has not changed since the last audit.
+            """
+)
+
+NAV_PROMPT_TEMPLATE = Template("""
+            Doing the following steps one by one, take ONLY one action at a time.
+            If there is anything you take that you have to login, stop and successful is `no`.
+            You are only allowed to click buttons that the instructions said to click.
+            You are only allowed to type the information that the instructions said to type.
+            Do not click any buttons that the instructions did not say to click.
+            Do not type any information that the instructions did not say to type.
+            instructions:
+            {$instructions}
+            Final Step: $goal. Then stop here.
+            $target_info_section
+            $audit_section
+            If you need to download any files, you need to add the name of the downloaded file to the `downloaded_files` field which is a list in the output.
+            Every time you download a file, you *MUST* add the name of the file to the `downloaded_files` field.
+            If you have been tried same steps for $tried_steps_navigation times and still not achieved the goal, you should stop and return `successful` as `no` and `feedback` as "I have been tried same steps for $tried_steps_navigation times and still not achieved the goal. I will stop here.".
+            If you already achieved the last goal, you should stop and return `successful` as `yes` and `feedback` as "I have achieved the goal: $goal. I will stop here.". DO NOT keep doing the same steps that have been done successfully.
+        """)
+
+
+@lru_cache(maxsize=512)
+def _navigate_actions(url: str) -> tuple[dict, ...]:
+    # browser-use only reads the initial actions, so one copy per URL is shared
+    return ({"navigate": {"url": url, "new_tab": False}},)
+
+
+def _page_check_key(
+    action: str, url: str, html: str, argument: str
+) -> tuple[str, str, bytes]:
+    digest = hashlib.blake2b(html.encode("utf-8"), digest_size=16)
+    digest.update(b"\0" + argument.encode("utf-8"))
+    return action, url, digest.digest()
+
+
 class GeneralResponse(BaseModel):
     successful: Literal["yes", "no"] = Field(
         description="yes or no, whether the general browser was successful"
@@ -59,6 +144,191 @@ class GeneralResponse(BaseModel):
     )
 
 
+@dataclass
+class GeneralBrowserRun:
+    """
+    State of one general_browser call, passed to the controller actions as the
+    browser-use agent context.
+    """
+
+    working_dir: str
+    generated_info: Optional[BrowserInfo] = None
+    # (url, html, audit_instructions) of audits not sent to the model yet
+    pending_audits: List[tuple[str, str, str]] = field(default_factory=list)
+    # Results of screenshot_check / audit_information keyed by _page_check_key, so
+    # checking an unchanged page again does not repeat the model call
+    page_check_results: dict[tuple[str, str, bytes], ActionResult] = field(
+        default_factory=dict
+    )
+
+    # Page HTML of the current browser step keyed by (target id, loader id, url)
+    # of the main frame, dropped at the end of the step
+    page_html: dict[tuple[str, str, str], str] = field(default_factory=dict)
+    # Page looked up by the first check of the current browser step, dropped at
+    # the end of the step
+    step_page: Optional[Any] = None
+
+    def end_step(self) -> None:
+        """Forget the page state of the browser step that just ended."""
+        # The next step may navigate, switch tabs or change the DOM in place
+        self.step_page = None
+        self.page_html.clear()
+
+    async def current_page(self, browser_session: BrowserSession):
+        """Current page of the session, looked up once per browser step."""
+        if self.step_page is None:
+            self.step_page = await browser_session.get_current_page()
+        return self.step_page
+
+    async def page_content(self, browser_session: BrowserSession, page) -> str:
+        """
+        HTML source of the page, read again within a browser step only after the
+        main frame navigated, so back-to-back checks of one page fetch the DOM once.
+
+        The loader id of the main frame changes with every new document and its url
+        with same-document navigations. Both are read over CDP, so nothing is
+        injected into the page. DOM changes that are not navigations are only
+        picked up by the next step, which is when the agent acts on the page.
+        """
+        try:
+            cdp_session = await browser_session.get_or_create_cdp_session(focus=False)
+            frame_tree = await cdp_session.cdp_client.send.Page.getFrameTree(
+                session_id=cdp_session.session_id
+            )
+            frame = frame_tree["frameTree"]["frame"]
+        except Exception as e:
+            logfire.warning(f"Could not read the main frame of the page: {e}")
+            return await page.content()
+        key = (cdp_session.target_id, frame["loaderId"], frame["url"])
+        html = self.page_html.get(key)
+        if html is None:
+            html = await page.content()
+            if len(self.page_html) >= PAGE_HTML_CACHE_MAX_SIZE:
+                self.page_html.pop(next(iter(self.page_html)))
+            self.page_html[key] = html
+        return html
+
+    def remember_page_check(self, key: tuple[str, str, bytes], result: ActionResult):
+        if len(self.page_check_results) >= PAGE_CHECK_CACHE_MAX_SIZE:
+            self.page_check_results.pop(next(iter(self.page_check_results)))
+        self.page_check_results[key] = result
+
+    async def flush_pending_audits(self):
+        if not self.pending_audits:
+            return
+        batch = self.pending_audits[:]
+        outputs = await audit_pages_batch(
+            [(html, instructions) for _, html, instructions in batch]
+        )
+        del self.pending_audits[: len(batch)]
+        if self.generated_info:
+            self.generated_info.extend_check_info(
+                [
+                    {
+                        "url": url,
+                        "pass_or_not": output.pass_audit,
+                        "reason": output.reason,
+                    }
+                    for (url, _, _), output in zip(batch, outputs)
+                    if output.has_info == "yes"
+                ]
+            )
+
+
+# Built once and shared by every general_browser agent; per-call state comes in
+# through the injected `context` (a GeneralBrowserRun) and `browser_session`
+GENERAL_BROWSER_CONTROLLER = Controller(
+    exclude_actions=["search_google", "open_tab"],
+    output_model=GeneralResponse,
+)
+
+
+@GENERAL_BROWSER_CONTROLLER.action(
+    "Check if some of the information user want is on this page"
+)
+async def screenshot_check(
+    target_info: str, browser_session: BrowserSession, context: GeneralBrowserRun
+):
+    # If the target_info is found on the page.
+    try:
+        page = await context.current_page(browser_session)
+        html = await context.page_content(browser_session, page)
+        key = _page_check_key("screenshot", page.url, html, target_info)
+        if key in context.page_check_results:
+            logfire.info(
+                "Skipping screenshot_check of unchanged page {url}",
+                url=page.url,
+            )
+            return context.page_check_results[key]
+        # Captured only once the page is known not to be checked already
+        screenshot = await take_screenshot(browser_session, full_page=True)
+        output = await filter_relevant_screenshots(html, target_info, screenshot)
+        if output == "yes":
+            screenshots = await screenshot_action(
+                browser_session=browser_session,
+                target_info=target_info,
+                full_page_screenshot=True,
+                # The page is unchanged, so the check's screenshot is reused
+                screenshot=screenshot,
+            )
+            generated_info = context.generated_info
+            if generated_info:
+                digest = screenshot_digest(screenshots)
+                # An identical screenshot of this page is not saved and recorded again
+                if not generated_info.has_screenshot(page.url, target_info, digest):
+                    # TODO: we don't have a way to save screenshot info and analyse it yet, so I put an empty list here
+                    img_list = await asyncio.get_running_loop().run_in_executor(
+                        _IMAGE_IO_POOL,
+                        save_blocks_as_images,
+                        screenshots,
+                        context.working_dir,
+                        str(len(generated_info.screenshot_info)),
+                    )
+                    generated_info.add_screenshot_info(
+                        page.url, img_list, target_info, digest
+                    )
+        result = ActionResult(
+            extracted_content=f"Runned screenshot_check for target {target_info} on {page.url}"
+        )
+        context.remember_page_check(key, result)
+        return result
+    except Exception as e:
+        logfire.error(f"Error in screenshot_check: {e}")
+        raise BrowserScreenshotException(f"Failed to check screenshot: {e}") from e
+
+
+@GENERAL_BROWSER_CONTROLLER.action(
+    "Check if the information on this page fit the requirements"
+)
+async def audit_information(
+    audit_instructions: str, browser_session: BrowserSession, context: GeneralBrowserRun
+):
+    # If the information on the page fit the requirements.
+    try:
+        page = await context.current_page(browser_session)
+        html = await context.page_content(browser_session, page)
+        key = _page_check_key("audit", page.url, html, audit_instructions)
+        if key in context.page_check_results:
+            logfire.info(
+                "Skipping audit_information of unchanged page {url}",
+                url=page.url,
+            )
+            return context.page_check_results[key]
+        # The audit result only goes to generated_info, so the model
+        # call is deferred and batched with the other audits
+        context.pending_audits.append((page.url, html, audit_instructions))
+        if len(context.pending_audits) >= AUDIT_BATCH_MAX_SIZE:
+            await context.flush_pending_audits()
+        result = ActionResult(
+            extracted_content=f"Runned audit_information for instruction: {audit_instructions} on {page.url}"
+        )
+        context.remember_page_check(key, result)
+        return result
+    except Exception as e:
+        logfire.error(f"Error in audit_information: {e}")
+        raise BrowserInfoCheckException(f"Failed to audit information: {e}") from e
+
+
 async def general_browser(
     ctx: RunContext[BaseDeps],
     instructions: str,
@@ -85,180 +355,128 @@ async def general_browser(
         retry_steps: Number of retry attempts if the agent fails.
     """
 
+    log_buffer = StepLogBuffer(ctx.deps)
+    browser_run = GeneralBrowserRun(
+        working_dir=ctx.deps.working_dir,
+        generated_info=generated_info,
+    )
+
     async def hook_on_step_end(agent: BrowserUseAgent):
+        browser_run.end_step()
+        # Both read the state of the step that just ended, so they run here
         model_output_logs = generate_model_output_logs(agent)
-        screenshot_logs = generate_screenshot_logs(agent)
+        screenshot_b64 = get_last_screenshot(agent)
 
-        await ctx.deps.add_log(model_output_logs + screenshot_logs)
+        # The screenshot upload and the database write happen in the background;
+        # the step loop does not wait for either
+        def produce_step_logs() -> list:
+            try:
+                screenshot_logs = upload_screenshot_logs(screenshot_b64)
+            except Exception:
+                # Already logged; the model output of the step is still stored
+                screenshot_logs = []
+            return model_output_logs + screenshot_logs
+
+        log_buffer.append(produce_step_logs)
+
+        try:
+            await browser_run.flush_pending_audits()
+        except Exception as e:
+            # Pending audits are kept and retried by the final flush
+            logfire.error(f"Error auditing pages at step end: {e}")
 
     logfire.info("Running general_browser action")
     try:
         target_info_section = (
-            f"""You also have a task about checking if some information is present and taking screenshots of them: If the instruction requires you to check and take screenshots of some information on some steps, when you are operating that step, check if the information you need is present by using the tool `screenshot_check` with the target information.
-            The target information is:
-            {{{target_information}}}
-            Remember you *MUST* run the tool `screenshot_check` to check if the information is present if the instruction requires it.
-            If the target_information said "take screenshot of something", then you *MUST* use the tool `screenshot_check` when you are operating that step.
-            And you need to generate the input for the tool `screenshot_check` with the target information. The input should not include things like "take screenshot of" or "check if", just the information you need to check or take screenshot of.
-            If the instructions require you to check if the information is in the page, you *MUST* use the tool `screenshot_check` to check if the information is present on the page.
-            On each page, you may run the screenshot_check tool at most once, regardless of how many targets or steps require it, as long as the page has not changed (by navigation, reload, or update).
-            It does not matter how many different targets or steps are requested—never run screenshot_check more than once for the same, unchanged page.
-            Only run screenshot_check again after the page content has changed.
-            """
+            TARGET_INFO_SECTION_TEMPLATE.substitute(
+                target_information=target_information
+            )
             if target_information
             else ""
         )
         audit_section = (
-            f"""Another task you need to do is to audit the page based on the instructions provided. If the instructions require you to audit, verify, or check some information on the page, you need to use the tool `audit_information` with the instructions.:
-            {{{audit_instructions}}}
-            Remember you *MUST* run the tool `audit_information` to audit the page if the instructions require it in certain steps.
-            Do not run the `audit_information` tool more than once on the same page if the page has not changed since the last audit.
-            """
+            AUDIT_SECTION_TEMPLATE.substitute(audit_instructions=audit_instructions)
             if audit_instructions
             else ""
         )
-        tried_steps_navigation = 3
-        nav_to_proj_prompt = """
-            Doing the following steps one by one, take ONLY one action at a time.
-            If there is anything you take that you have to login, stop and successful is `no`.
-            You are only allowed to click buttons that the instructions said to click.
-            You are only allowed to type the information that the instructions said to type.
-            Do not click any buttons that the instructions did not say to click.
-            Do not type any information that the instructions did not say to type.
-            instructions:
-            {{{instructions}}}
-            Final Step: {goal}. Then stop here.
-            {target_info_section}
-            {audit_section}
-            If you need to download any files, you need to add the name of the downloaded file to the `downloaded_files` field which is a list in the output.
-            Every time you download a file, you *MUST* add the name of the file to the `downloaded_files` field.
-            If you have been tried same steps for {tried_steps_navigation} times and still not achieved the goal, you should stop and return `successful` as `no` and `feedback` as "I have been tried same steps for {tried_steps_navigation} times and still not achieved the goal. I will stop here.".
-            If you already achieved the last goal, you should stop and return `successful` as `yes` and `feedback` as "I have achieved the goal: {goal}. I will stop here.". DO NOT keep doing the same steps that have been done successfully.
-        """.format(
+        nav_to_proj_prompt = NAV_PROMPT_TEMPLATE.substitute(
             instructions=instructions,
             goal=goal,
             target_info_section=target_info_section,
             audit_section=audit_section,
-            tried_steps_navigation=tried_steps_navigation,
+            tried_steps_navigation=TRIED_STEPS_NAVIGATION,
         )
         browser_deps = ctx.deps.get_browser_deps()
         if not browser_deps:
             ctx.deps.init_browser_deps()
             browser_deps = ctx.deps.get_browser_deps()
 
-        browser_context = browser_deps.browser_session.browser_context
-
-        initial_actions = []
-        if initial_url:
-            initial_actions.append({"navigate": {"url": initial_url, "new_tab": False}})
+        initial_actions = list(_navigate_actions(initial_url)) if initial_url else []
 
         llm = get_browser_use_openai_llm()
 
-        controller = Controller(
-            exclude_actions=["search_google", "open_tab"],
-            output_model=GeneralResponse,
-        )
-
-        @controller.action("Check if some of the information user want is on this page")
-        async def screenshot_check(target_info: str):
-            # If the target_info is found on the page.
-            try:
-                page = await browser_deps.browser_session.get_current_page()
-                html = await page.content()
-                screenshot = await take_screenshot(
-                    browser_deps.browser_session, full_page=True
-                )
-                output = await filter_relevant_screenshots(
-                    html, target_info, screenshot
+        agent_successful = "no"
+        parsed_result = None
+        agent_result = None
+        try:
+            while retry_steps >= 1 and agent_successful == "no":
+                agent = BrowserUseAgent(
+                    initial_actions=initial_actions,
+                    task=nav_to_proj_prompt,
+                    browser_session=browser_deps.browser_session,
+                    llm=llm,
+                    controller=GENERAL_BROWSER_CONTROLLER,
+                    context=browser_run,
+                    use_vision=False,
+                    file_system_path=browser_deps.execution_space_path / "file_system",
                 )
-                if output == "yes":
-                    screenshots = await screenshot_action(
-                        browser_session=browser_deps.browser_session,
-                        target_info=target_info,
-                        full_page_screenshot=True,
-                    )
-                    working_dir = ctx.deps.working_dir
-                    if generated_info:
-                        # TODO: we don't have a way to save screenshot info and analyse it yet, so I put an empty list here
-                        img_list = save_blocks_as_images(
-                            screenshots,
-                            working_dir,
-                            str(len(generated_info.screenshot_info)),
-                        )
-                        generated_info.add_screenshot_info(
-                            page.url, img_list, target_info
-                        )
-                return ActionResult(
-                    extracted_content=f"Runned screenshot_check for target {target_info} on {page.url}"
+                agent_result = await agent.run(
+                    max_steps=max_steps,
+                    on_step_end=hook_on_step_end,
                 )
-            except Exception as e:
-                logfire.error(f"Error in screenshot_check: {e}")
-                raise BrowserScreenshotException(
-                    f"Failed to check screenshot: {e}"
-                ) from e
-
-        @controller.action("Check if the information on this page fit the requirements")
-        async def audit_information(audit_instructions: str):
-            # If the information on the page fit the requirements.
+
+                raw_result = agent_result.final_result()
+                if raw_result:
+                    try:
+                        parsed_result = GeneralResponse.model_validate_json(raw_result)
+                    except (ValueError, TypeError) as parse_error:
+                        raise ValueError(
+                            f"Failed to parse agent response as JSON: {parse_error}"
+                        ) from parse_error
+                else:
+                    raise ValueError("Agent exited without returning a response")
+                agent_successful = parsed_result.successful
+                retry_steps -= 1
+        finally:
+            # Audits collected before the agent finished, or failed, still reach
+            # generated_info. As with an audit_information call, a failed audit
+            # does not fail the navigation
             try:
-                page = await browser_deps.browser_session.get_current_page()
-                html = await page.content()
-                output = await audit_page(html, audit_instructions)
-                if output.has_info == "yes":
-                    if generated_info:
-                        generated_info.add_check_info(
-                            url=page.url,
-                            pass_or_not=output.pass_audit,
-                            reason=output.reason,
-                        )
-                return ActionResult(
-                    extracted_content=f"Runned audit_information for instruction: {audit_instructions} on {page.url}"
-                )
+                await browser_run.flush_pending_audits()
             except Exception as e:
-                logfire.error(f"Error in audit_information: {e}")
-                raise BrowserInfoCheckException(
-                    f"Failed to audit information: {e}"
-                ) from e
-
-        agent_successful = "no"
-        parsed_result = None
-        while retry_steps >= 1 and agent_successful == "no":
-            agent = BrowserUseAgent(
-                initial_actions=initial_actions,
-                task=nav_to_proj_prompt,
-                browser_session=browser_deps.browser_session,
-                llm=llm,
-                controller=controller,
-                use_vision=False,
-                file_system_path=browser_deps.execution_space_path / "file_system",
-            )
-            agent_result = await agent.run(
-                max_steps=max_steps,
-                on_step_end=hook_on_step_end,
-            )
-
-            raw_result = agent_result.final_result()
-            if raw_result:
-                try:
-                    parsed_result = GeneralResponse.model_validate_json(raw_result)
-                except (ValueError, TypeError) as parse_error:
-                    raise ValueError(
-                        f"Failed to parse agent response as JSON: {parse_error}"
-                    ) from parse_error
-            else:
-                raise ValueError("Agent exited without returning a response")
-            agent_successful = parsed_result.successful
-            retry_steps -= 1
-        if parsed_result is None:
+                logfire.error(f"Error auditing pages: {e}")
+            await log_buffer.aclose()
+        if parsed_result is None or agent_result is None:
             raise ValueError("No agent execution completed successfully")
 
         current_page = await browser_deps.browser_session.get_current_page()
         final_feedback = parsed_result.feedback
         if parsed_result.successful == "no":
-            screenshots = agent_result.screenshots()
+            # browser-use keeps screenshots base64 encoded; only the last one is
+            # loaded and decoded
+            last_screenshot = get_history_last_screenshot(agent_result)
+            screenshot = None
+            if last_screenshot:
+                try:
+                    # Multi-MB screenshots would block the event loop while decoding
+                    screenshot = await asyncio.to_thread(
+                        base64.b64decode, last_screenshot
+                    )
+                except ValueError:
+                    logfire.warning("Error decoding screenshot")
             final_feedback = await get_real_feedback(
                 original_feedback=parsed_result.feedback,
-                screenshot=screenshots[-1] if screenshots else "",
+                screenshot=screenshot,
                 user_prompt=instructions,
             )
 
@@ -268,10 +486,10 @@ async def general_browser(
             feedback=final_feedback,
             downloaded_files=parsed_result.downloaded_files,
         )
-        result = result.model_dump()
-        logfire.info(f"GeneralBrowser result: {result}")
+        # logfire serializes the model itself, only the return value is dumped
+        logfire.info("GeneralBrowser result: {result}", result=result)
 
-        return result
+        return result.model_dump()
 
     except Exception as e:
         logfire.error(f"Error in GeneralBrowser: {e}")
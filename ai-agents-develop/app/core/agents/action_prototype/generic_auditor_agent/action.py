@@ -1,3 +1,4 @@
+import asyncio
 from dataclasses import dataclass
 from typing import Literal
 
@@ -7,12 +8,15 @@ from pydantic import BaseModel, Field, ValidationError
 from pydantic_ai import Agent, RunContext, Tool
 from pydantic_graph import BaseNode, GraphRunContext
 
+from app.core.agents.action_prototype.file_inspection.tools import (
+    close_file_process_session,
+)
 from app.core.agents.action_prototype.generic_auditor_agent.schema import (
     GenericAuditorAgentDeps,
     GenericAuditorAgentOutput,
 )
 from app.core.agents.action_prototype.generic_auditor_agent.supervisor_tools.save_locally import (
-    save_locally,
+    save_messages_locally,
 )
 from app.core.agents.action_prototype.generic_auditor_agent.supervisor_tools.tools import (
     SupervisorTools,
@@ -44,7 +48,8 @@ SUPERVISOR_PROMPT = """
         1. Analyze the user’s request and determine which tools are needed and their correct order.
 
         2. Tool usage:
-        • Always use tools sequentially, never in parallel.
+        • login() and navigation() share one browser: call them one at a time, never in parallel.
+        • files_process() does not use the browser: calls on files that are already downloaded may be made in parallel with each other or with a navigation() call.
         • Do not skip required steps; each tool must be used in the correct order.
 
         3. login():
@@ -202,8 +207,9 @@ class GenericAuditorAgent(BaseNode[State]):
                 if self.current_deps.page_audit_check_information
                 else ""
             )
-            agent_result = await agent.run(
-                user_prompt=f"""
+            try:
+                agent_result = await agent.run(
+                    user_prompt=f"""
                 The user's prompt is:
                 {self.current_deps.user_prompt}
                 The login information is:
@@ -211,18 +217,29 @@ class GenericAuditorAgent(BaseNode[State]):
                 {target_info}
                 {check_info}
                 """,
-                deps=ctx.deps,
-            )
-            if not supervisor_tool_set.navigation_successful:
+                    deps=ctx.deps,
+                )
+            finally:
+                # files_process calls of this run share one code interpreter container
+                await close_file_process_session(ctx.deps.working_dir)
+            # The browser info is written to disk while the failure explanation
+            # is generated
+            save_tasks = [
+                asyncio.to_thread(
+                    supervisor_tool_set.save_browser_info, ctx.deps.working_dir
+                )
+            ]
+            if supervisor_tool_set.navigation_failed:
                 logfire.error("failed navigation")
-                await supervisor_tool_set.failed_log(ctx.deps.working_dir)
-            supervisor_tool_set.save_browser_info(ctx.deps.working_dir)
+                save_tasks.append(supervisor_tool_set.failed_log(ctx.deps.working_dir))
+            await asyncio.gather(*save_tasks)
             if not agent_result:
                 raise ValueError("Agent exited without returning a response")
-            save_locally(
-                str(agent_result.all_messages()),
+            await asyncio.to_thread(
+                save_messages_locally,
+                agent_result.all_messages(),
                 ctx.deps.working_dir,
-                "supervisor_log.txt",
+                "supervisor_log.jsonl",
             )
 
             evidence = []
@@ -238,10 +255,9 @@ class GenericAuditorAgent(BaseNode[State]):
             res = GenericAuditorAgentOutput(
                 **agent_result.output.model_dump(),
                 evidence=evidence,
-                screenshot_info=[
-                    i.model_dump()
-                    for i in supervisor_tool_set.browser_info.screenshot_info
-                ],
+                # Kept as models: the extra field is serialized once, when the
+                # output is dumped in run()
+                screenshot_info=supervisor_tool_set.browser_info.screenshot_info,
             )
             return res
         except Exception as e:
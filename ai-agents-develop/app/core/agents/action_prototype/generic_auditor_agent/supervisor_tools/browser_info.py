@@ -1,6 +1,7 @@
+import hashlib
 from typing import List, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 
 class ScreenshotInformation(BaseModel):
@@ -38,12 +39,48 @@ class AuditInformation(BaseModel):
     )
 
 
+AUDIT_INFORMATION_LIST_ADAPTER = TypeAdapter(List[AuditInformation])
+
+
+def screenshot_digest(blocks: List[bytes]) -> str:
+    """Digest of the screenshot image bytes, used to recognize a repeated screenshot."""
+    digest = hashlib.blake2b(digest_size=16)
+    for block in blocks:
+        digest.update(len(block).to_bytes(8, "little"))
+        digest.update(block)
+    return digest.hexdigest()
+
+
 class BrowserInfo:
     def __init__(self):
         self.screenshot_info: List[ScreenshotInformation] = []
         self.check_info: List[AuditInformation] = []
+        # Entries already recorded, so revisiting a page does not add duplicates.
+        # Stored image names are unique per save, so screenshots are keyed by
+        # (url, target_info, screenshot_digest of the image bytes) instead
+        self._screenshot_keys: set[tuple[str, str, str]] = set()
+        self._check_keys: set[tuple[str, str, str]] = set()
+
+    def has_screenshot(self, url: str, target_info: str, digest: str) -> bool:
+        """Whether an identical screenshot of url was already recorded for target_info."""
+        return (url, target_info, digest) in self._screenshot_keys
 
-    def add_screenshot_info(self, url: str, stored_images: list, target_info: str = ""):
+    def add_screenshot_info(
+        self,
+        url: str,
+        stored_images: list,
+        target_info: str = "",
+        digest: str | None = None,
+    ):
+        """
+        Record a screenshot. With the screenshot_digest of its images, an identical
+        screenshot of the same page and target is only recorded once.
+        """
+        if digest is not None:
+            key = (url, target_info, digest)
+            if key in self._screenshot_keys:
+                return
+            self._screenshot_keys.add(key)
         self.screenshot_info.append(
             ScreenshotInformation(
                 url=url, stored_images=stored_images, target_info=target_info
@@ -51,6 +88,15 @@ class BrowserInfo:
         )
 
     def add_check_info(self, url: str, pass_or_not: Literal["yes", "no"], reason: str):
-        self.check_info.append(
-            AuditInformation(url=url, pass_or_not=pass_or_not, reason=reason)
+        self.extend_check_info(
+            [{"url": url, "pass_or_not": pass_or_not, "reason": reason}]
         )
+
+    def extend_check_info(self, check_info: List[dict]):
+        """Add several audit results, validated in one pass."""
+        for info in AUDIT_INFORMATION_LIST_ADAPTER.validate_python(check_info):
+            key = (info.url, info.pass_or_not, info.reason)
+            if key in self._check_keys:
+                continue
+            self._check_keys.add(key)
+            self.check_info.append(info)
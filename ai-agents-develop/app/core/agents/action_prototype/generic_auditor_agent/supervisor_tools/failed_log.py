@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from pydantic_ai import Agent
 
+from app.core.llm.cache import cached_agent_run
 from app.core.llm.pydanticai.openai_model import get_pydanticai_openai_llm
 
 
@@ -12,21 +13,33 @@ class FailedLog(BaseModel):
     explanation: str
 
 
-async def failed_log_generator(info_content: str) -> str:
-    try:
-        agent_system_prompt = f"""
+FAILED_LOG_SYSTEM_PROMPT = """
             Your task is to analyze a feedback from the browser navigation and return an explanation of the failed navigation.
             You need to tell the user what went wrong and what they can do to fix it.
             """
-        agent = Agent(
-            model=get_pydanticai_openai_llm(),
-            system_prompt=agent_system_prompt,
-            output_type=FailedLog,
-        )
+
+FAILED_LOG_AGENT = Agent(
+    model=get_pydanticai_openai_llm(),
+    system_prompt=FAILED_LOG_SYSTEM_PROMPT,
+    output_type=FailedLog,
+)
+
+
+async def failed_log_generator(info_content: str) -> str:
+    try:
         user_prompt = f" \n The information content is: {info_content}."
-        result = await agent.run(user_prompt)
-        output = FailedLog.model_validate(result.output)
-        return output.explanation
+
+        async def run() -> str:
+            result = await FAILED_LOG_AGENT.run(user_prompt)
+            # output_type=FailedLog, so the output is already validated
+            return result.output.explanation
+
+        # Repeated navigation failures often carry the same feedback
+        return await cached_agent_run(
+            info_content.encode("utf-8"),
+            run,
+            model_name=FAILED_LOG_AGENT.model.model_name,
+        )
     except Exception as e:
         raise FailedLogException(
             f"Failed to generate failed log explanation: {str(e)}"
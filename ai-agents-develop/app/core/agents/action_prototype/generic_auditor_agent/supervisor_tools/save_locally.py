@@ -1,4 +1,11 @@
+import asyncio
 import os
+from typing import Iterable, Sequence
+
+from pydantic import TypeAdapter
+from pydantic_ai.messages import ModelMessage
+
+_MODEL_MESSAGE_ADAPTER = TypeAdapter(ModelMessage)
 
 
 def save_locally(data: str, work_dir: str, name: str) -> None:
@@ -13,7 +20,63 @@ def save_locally(data: str, work_dir: str, name: str) -> None:
     try:
         os.makedirs(work_dir, exist_ok=True)  # Ensure the directory exists
         filename = os.path.join(work_dir, name)
-        with open(filename, "w", encoding="utf-8") as file:
-            file.write(data)
+        # Encoded once and written straight to the fd, without the text and
+        # buffered IO layers of open(); 0o666 is the mode open() creates files
+        # with, so the umask decides the permissions as before
+        remaining = memoryview(data.encode("utf-8"))
+        fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+        try:
+            while remaining:
+                remaining = remaining[os.write(fd, remaining) :]
+        finally:
+            os.close(fd)
+    except Exception as e:
+        raise IOError(f"Failed to save file {name} in {work_dir}: {e}") from e
+
+
+def save_lines_locally(lines: Iterable[str], work_dir: str, name: str) -> None:
+    """
+    Save the given text pieces to a file as they are produced, so the whole content
+    is never held as a single string.
+
+    Args:
+        lines (Iterable[str]): The content to save, written in order.
+        work_dir (str): The directory where the file will be saved.
+        name (str): The name of the file to save.
+    """
+    try:
+        os.makedirs(work_dir, exist_ok=True)  # Ensure the directory exists
+        filename = os.path.join(work_dir, name)
+        with open(filename, "w", encoding="utf-8", buffering=64 * 1024) as file:
+            file.writelines(lines)
+    except Exception as e:
+        raise IOError(f"Failed to save file {name} in {work_dir}: {e}") from e
+
+
+async def save_locally_async(data: str, work_dir: str, name: str) -> None:
+    """
+    Same as save_locally, but the write runs in a worker thread so the event loop is not blocked.
+    """
+    await asyncio.to_thread(save_locally, data, work_dir, name)
+
+
+def save_messages_locally(
+    messages: Sequence[ModelMessage], work_dir: str, name: str
+) -> None:
+    """
+    Save agent messages as JSON lines, serializing one message at a time so the
+    whole history is never held as a single string.
+
+    Args:
+        messages (Sequence[ModelMessage]): The messages to save.
+        work_dir (str): The directory where the file will be saved.
+        name (str): The name of the file to save.
+    """
+    try:
+        os.makedirs(work_dir, exist_ok=True)  # Ensure the directory exists
+        filename = os.path.join(work_dir, name)
+        with open(filename, "wb") as file:
+            for message in messages:
+                file.write(_MODEL_MESSAGE_ADAPTER.dump_json(message) + b"\n")
     except Exception as e:
         raise IOError(f"Failed to save file {name} in {work_dir}: {e}") from e
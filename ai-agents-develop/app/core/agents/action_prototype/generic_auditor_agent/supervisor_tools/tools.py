@@ -1,5 +1,7 @@
+import asyncio
 import os
-from typing import Literal
+from dataclasses import dataclass
+from typing import Iterator, Literal
 
 import logfire
 from pydantic_ai import RunContext
@@ -14,7 +16,8 @@ from app.core.agents.action_prototype.generic_auditor_agent.supervisor_tools.fai
     failed_log_generator,
 )
 from app.core.agents.action_prototype.generic_auditor_agent.supervisor_tools.save_locally import (
-    save_locally,
+    save_lines_locally,
+    save_locally_async,
 )
 from app.core.agents.action_prototype.login.tool import login
 from app.core.graph.deps.action_deps import ActionDeps
@@ -40,17 +43,30 @@ class FileToolException(Exception):
     """Custom exception raised for errors in the file tool."""
 
 
+@dataclass(frozen=True)
+class NavigationResult:
+    """Outcome of one navigation_run call."""
+
+    successful: bool
+    feedback: str
+
+
 class SupervisorTools:
     browser_info: BrowserInfo
-    file_process_result: str
-    navigation_feedback: str
-    navigation_successful: bool
+    file_process_results: list[str]
+    last_navigation: NavigationResult | None
 
     def __init__(self):
         self.browser_info = BrowserInfo()
-        self.file_process_result = ""
-        self.navigation_feedback = ""
-        self.navigation_successful = False
+        # The supervisor may run several files_process calls in parallel, so
+        # every call appends its own result
+        self.file_process_results = []
+        # Replaced as a whole by every navigation_run, while it still holds the
+        # browser, so the success flag and feedback always belong together
+        self.last_navigation = None
+        # login and navigation drive the same browser, so the supervisor may call
+        # them in parallel with files_process but they run one at a time
+        self.browser_lock = asyncio.Lock()
 
     async def login_run(
         self,
@@ -65,15 +81,16 @@ class SupervisorTools:
         logfire.info("Running login action")
         try:
             # === logic ===
-            result = await login(
-                ctx,
-                initial_url=login_url,
-                username=username,
-                password=password,
-                instructions=instructions,
-                mfa_secret=mfa_secret,
-                max_steps=max_steps,
-            )
+            async with self.browser_lock:
+                result = await login(
+                    ctx,
+                    initial_url=login_url,
+                    username=username,
+                    password=password,
+                    instructions=instructions,
+                    mfa_secret=mfa_secret,
+                    max_steps=max_steps,
+                )
             # ==== end logic ====
 
             successful = result.successful
@@ -98,42 +115,67 @@ class SupervisorTools:
 
         try:
             # === logic ===
-            res = await general_browser(
-                ctx,
-                instructions,
-                goal,
-                initial_url,
-                target_information,
-                audit_instructions=check_information,
-                generated_info=self.browser_info,
-            )
+            async with self.browser_lock:
+                try:
+                    res = await general_browser(
+                        ctx,
+                        instructions,
+                        goal,
+                        initial_url,
+                        target_information,
+                        audit_instructions=check_information,
+                        generated_info=self.browser_info,
+                    )
+                except Exception as e:
+                    self.last_navigation = NavigationResult(
+                        successful=False, feedback=str(e)
+                    )
+                    raise
+                # res is the dump of a GeneralBrowserOutput built by general_browser
+                result = GeneralBrowserOutput.model_construct(**res)
+                self.last_navigation = NavigationResult(
+                    successful=result.successful == "yes", feedback=result.feedback
+                )
             # ==== end logic ====
-            result = GeneralBrowserOutput.model_validate(res)
-            success = result.successful
-            self.navigation_feedback = result.feedback
-            if success == "no":
-                self.navigation_successful = False
+            if not self.last_navigation.successful:
                 raise
-            elif success == "yes":
-                self.navigation_successful = True
             ret = result.model_dump_json()
             return ret
         except Exception as e:
             logfire.error(f"Error in Navigation action: {e}")
             raise NavigationToolException(f"Navigation action failed: {e}") from e
 
+    @property
+    def navigation_successful(self) -> bool:
+        return self.last_navigation is not None and self.last_navigation.successful
+
+    @property
+    def navigation_failed(self) -> bool:
+        """Whether a navigation ran and failed, False if none was attempted."""
+        return self.last_navigation is not None and not self.last_navigation.successful
+
+    @property
+    def navigation_feedback(self) -> str:
+        return self.last_navigation.feedback if self.last_navigation else ""
+
+    def _browser_info_lines(self) -> Iterator[str]:
+        # One JSON line per model, produced while the file is written
+        yield "Browser Information:\n"
+        for check_info in self.browser_info.check_info:
+            yield check_info.model_dump_json() + "\n"
+        for screenshot_info in self.browser_info.screenshot_info:
+            yield screenshot_info.model_dump_json() + "\n"
+        yield "Files Processed Results:\n"
+        for result in self.file_process_results:
+            yield result + "\n"
+
     def save_browser_info(
         self, working_dir: str, file_name: str = "browser_info.txt"
     ) -> None:
         """Save the browser information to the working directory."""
         logfire.info("Saving browser information")
         try:
-            to_be_saved = "Browser Information:\n"
-            to_be_saved += str(self.browser_info.check_info) + "\n"
-            to_be_saved += str(self.browser_info.screenshot_info) + "\n"
-            to_be_saved += "Files Processed Results:\n"
-            to_be_saved += str(self.file_process_result) + "\n"
-            save_locally(to_be_saved, working_dir, file_name)
+            save_lines_locally(self._browser_info_lines(), working_dir, file_name)
             logfire.info(f"Browser information saved to {working_dir}")
         except Exception as e:
             logfire.error(f"Error saving browser information: {e}")
@@ -148,15 +190,18 @@ class SupervisorTools:
         """Process the files, first input is the instruction, second is the file names."""
         logfire.info("Running files processing action")
         working_dir = ctx.deps.working_dir
+        # ".." and symlinks in file names are resolved before the prefix check, so
+        # no file name can point outside the working dir
+        working_dir_prefix = os.path.join(os.path.realpath(working_dir), "")
         file_path_list = []
         for file in file_names:
-            file_path = os.path.join(working_dir, file)
-            if os.path.commonpath([file_path, working_dir]) == working_dir:
-                file_path_list.append(file_path)
-            else:
+            file_path = os.path.realpath(os.path.join(working_dir_prefix, file))
+            if not file_path.startswith(working_dir_prefix):
                 raise ValueError(f"Invalid file path: {file}")
+            file_path_list.append(file_path)
         try:
             # === logic ===
+            # The container is closed by the supervisor once its run is done
             res = await file_process(
                 ctx,
                 instructions=instructions,
@@ -164,7 +209,7 @@ class SupervisorTools:
             )
             # ==== end logic ====
             logfire.info(f"Files processing result: {res}")
-            self.file_process_result = res
+            self.file_process_results.append(res)
             return res
         except Exception as e:
             logfire.error(f"Error in Files Processing action: {e}")
@@ -172,10 +217,14 @@ class SupervisorTools:
 
     async def failed_log(self, working_dir: str) -> None:
         """Log the failure details."""
-        navigation_feedback: str
-        if not self.navigation_successful:
-            navigation_feedback = self.navigation_feedback
-            fail_res = await failed_log_generator(navigation_feedback)
+        # Read once, the explanation is generated for this navigation even if
+        # another one finishes meanwhile
+        navigation = self.last_navigation
+        # Nothing to explain if no navigation was attempted
+        if navigation is not None and not navigation.successful:
+            fail_res = await failed_log_generator(navigation.feedback)
             to_be_saved = "Failed reason:\n"
             to_be_saved += fail_res
-            save_locally(to_be_saved, working_dir, "browser_failed_reason.txt")
+            await save_locally_async(
+                to_be_saved, working_dir, "browser_failed_reason.txt"
+            )
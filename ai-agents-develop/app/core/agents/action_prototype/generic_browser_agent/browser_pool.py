@@ -0,0 +1,152 @@
+import asyncio
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Callable, Hashable
+
+import logfire
+from pydantic_ai.mcp import MCPServer
+
+# Idle servers kept warm per event loop across all keys, and how long an idle one
+# is kept
+MCP_SERVER_POOL_MAX_IDLE = 4
+MCP_SERVER_IDLE_TTL_SECONDS = 300
+
+
+class MCPServerPoolException(Exception):
+    """Custom exception raised when a pooled MCP server cannot be started."""
+
+
+@dataclass
+class PooledMCPServer:
+    server: MCPServer
+    key: Hashable
+    # The server is entered and exited by its owner task, anyio requires both to
+    # happen in the same task; setting stop makes the owner shut the server down
+    owner: asyncio.Task
+    stop: asyncio.Event = field(default_factory=asyncio.Event)
+    loop: asyncio.AbstractEventLoop = field(default_factory=asyncio.get_running_loop)
+    idle_since: float = 0.0
+
+    @property
+    def alive(self) -> bool:
+        return not self.owner.done()
+
+    def close(self) -> None:
+        """Shut the server down; safe to call from any thread."""
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self.loop:
+            self.stop.set()
+        elif not self.loop.is_closed():
+            # The event belongs to the server's loop, which may run in another thread
+            self.loop.call_soon_threadsafe(self.stop.set)
+
+
+class MCPServerPool:
+    """
+    Warm MCP servers handed out to one browser agent run at a time, so a run does not
+    cold start Node, the MCP server and Chromium.
+
+    Servers are tied to the event loop that started them, so idle servers are kept
+    per loop, as in app/core/llm/http_client.py. The scheduler runs each control
+    execution in its own loop, so a warm server is only reused by later runs of the
+    same execution. Each loop only touches its own idle list; a loop that ends
+    cancels the owner tasks of its idle servers. When a server is released, its
+    browser is closed with the `browser_close` tool; with --isolated the next run
+    starts from the storage state again.
+    """
+
+    def __init__(
+        self,
+        max_idle: int = MCP_SERVER_POOL_MAX_IDLE,
+        idle_ttl: float = MCP_SERVER_IDLE_TTL_SECONDS,
+    ):
+        self.max_idle = max_idle
+        self.idle_ttl = idle_ttl
+        # Idle servers of each loop, oldest first
+        self._idle: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, list[PooledMCPServer]
+        ] = weakref.WeakKeyDictionary()
+
+    def _loop_idle(self) -> list[PooledMCPServer]:
+        loop = asyncio.get_running_loop()
+        idle = self._idle.get(loop)
+        if idle is None:
+            idle = self._idle[loop] = []
+        return idle
+
+    async def acquire(
+        self, key: Hashable, create_server: Callable[[], MCPServer]
+    ) -> PooledMCPServer:
+        """Take an idle server for the key, or start a new one."""
+        self._evict_expired()
+        idle = self._loop_idle()
+        for i in range(len(idle) - 1, -1, -1):
+            if idle[i].key == key:
+                logfire.info("Reusing warm MCP server")
+                return idle.pop(i)
+        return await self._start(key, create_server())
+
+    async def release(self, pooled: PooledMCPServer, reusable: bool = True) -> None:
+        """Give the server back, or shut it down if the run left it unusable."""
+        if reusable and pooled.alive:
+            try:
+                await pooled.server.direct_call_tool("browser_close", {})
+            except Exception as e:
+                logfire.warning(f"Could not reset MCP server, closing it: {e}")
+                reusable = False
+        if not (reusable and pooled.alive):
+            pooled.close()
+            return
+
+        pooled.idle_since = time.monotonic()
+        idle = self._loop_idle()
+        idle.append(pooled)
+        while len(idle) > self.max_idle:
+            idle.pop(0).close()
+        asyncio.get_running_loop().call_later(self.idle_ttl, self._evict_expired)
+
+    def _evict_expired(self) -> None:
+        """Close the expired idle servers of the running loop."""
+        now = time.monotonic()
+        idle = self._loop_idle()
+        kept = []
+        for pooled in idle:
+            if pooled.alive and now - pooled.idle_since < self.idle_ttl:
+                kept.append(pooled)
+            else:
+                pooled.close()
+        idle[:] = kept
+
+    async def _start(self, key: Hashable, server: MCPServer) -> PooledMCPServer:
+        ready = asyncio.get_running_loop().create_future()
+        stop = asyncio.Event()
+
+        async def hold() -> None:
+            try:
+                async with server:
+                    ready.set_result(None)
+                    await stop.wait()
+            except Exception as e:
+                if not ready.done():
+                    ready.set_exception(e)
+                else:
+                    # Nobody awaits the owner task, the server is just not reused
+                    logfire.warning(f"Pooled MCP server stopped: {e}")
+
+        owner = asyncio.create_task(hold())
+        try:
+            await ready
+        except BaseException as e:
+            stop.set()
+            owner.cancel()
+            if isinstance(e, Exception):
+                raise MCPServerPoolException(f"Failed to start MCP server: {e}") from e
+            raise
+        return PooledMCPServer(server=server, key=key, owner=owner, stop=stop)
+
+
+PLAYWRIGHT_MCP_SERVER_POOL = MCPServerPool()
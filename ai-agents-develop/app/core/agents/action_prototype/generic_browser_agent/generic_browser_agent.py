@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 from typing import List, Optional
 
@@ -50,6 +51,11 @@ async def generic_browser_agent(
 
     llm = get_browser_use_openai_llm(model_name=model_name)
 
+    # Used by verify_downloaded_files and the post-processing below
+    download_dir = (
+        Path(ctx.deps.working_dir) / "downloads" if ctx.deps.working_dir else None
+    )
+
     # Set default excluded actions if none provided
     if excluded_actions is None:
         excluded_actions = ["search_google", "open_tab"]
@@ -61,13 +67,13 @@ async def generic_browser_agent(
 
     @controller.action("Verify downloaded files")
     async def verify_downloaded_files(self):
-        assert ctx.deps.working_dir is not None
-        download_dir = Path(ctx.deps.working_dir) / "downloads"
+        assert download_dir is not None
         result = []
         if download_dir.exists():
-            for file in download_dir.iterdir():
-                if file.is_file():
-                    result.append(file.name)
+            # DirEntry.is_file() uses the type returned by the directory read,
+            # no stat call per file
+            with os.scandir(download_dir) as entries:
+                result = [entry.name for entry in entries if entry.is_file()]
         logfire.info(f"Generic Browser Agent > Downloaded files: {result}")
         return ActionResult(extracted_content=f"Downloaded files: {result}")
 
@@ -119,15 +125,19 @@ async def generic_browser_agent(
     if parsed_result.files:
         files_with_path = []
         assert (
-            ctx.deps.working_dir
+            download_dir is not None
         ), "ctx.deps.working_dir is None, cannot save post-process files"
-        download_dir = Path(ctx.deps.working_dir) / "downloads"
         logfire.info(f"Checking Dir: {download_dir}")
 
+        # One directory scan covers the files saved directly in the downloads
+        # folder; names with a subdirectory are still checked one by one
+        downloaded = set()
+        if download_dir.is_dir():
+            with os.scandir(download_dir) as entries:
+                downloaded = {entry.name for entry in entries if entry.is_file()}
         for file in parsed_result.files:
-            file_path = download_dir / file
-            if file_path.exists():
-                files_with_path.append(str(file_path))
+            if file in downloaded or (download_dir / file).exists():
+                files_with_path.append(str(download_dir / file))
             else:
                 logfire.warning(f"File {file} not found in the downloads folder")
 
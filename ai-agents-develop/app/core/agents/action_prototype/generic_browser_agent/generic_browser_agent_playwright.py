@@ -1,3 +1,7 @@
+import asyncio
+import time
+import weakref
+from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
 from typing import Optional
@@ -14,6 +18,10 @@ from app.core.agents.action_prototype.auth_agents.authentication_agent import (
     create_authenticated_session_with_agents,
 )
 from app.core.agents.action_prototype.browser_tool.action import process_tool_call
+from app.core.agents.action_prototype.generic_browser_agent.browser_pool import (
+    PLAYWRIGHT_MCP_SERVER_POOL,
+    PooledMCPServer,
+)
 from app.core.agents.action_prototype.generic_browser_agent.schema import (
     ActionDeps,
     GenericBrowserAgentDeps,
@@ -25,25 +33,86 @@ from app.core.agents.action_prototype.utils import (
     trim_page_snapshots_processor,
 )
 from app.core.agents.utils.browser_utils.file_processing import process_downloaded_files
+from app.core.agents.utils.browser_utils.mcp_process_management import (
+    playwright_mcp_command,
+)
 from app.core.llm.pydanticai.gemini_model import get_pydanticai_gemini_llm  # noqa: F401
 from app.core.llm.pydanticai.openai_model import get_pydanticai_openai_llm  # noqa: F401
 
+# Successful session checks keyed by (storage state path, test url), as
+# (storage state mtime_ns, checked at), so back-to-back runs skip the headless
+# auth check; a rewritten storage state or a failed run invalidates the entry
+AUTH_STATUS_TTL_SECONDS = 300
+_auth_status_cache: dict[tuple[str, str], tuple[int, float]] = {}
+
+
+@dataclass
+class _AuthStatusCheck:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    # Runs holding or waiting for the lock; the entry is dropped at zero
+    users: int = 0
+
+
+# One lock per key, so concurrent runs share one check. asyncio locks belong to one
+# event loop and each control execution runs in its own loop, so they are kept per
+# loop; each loop only touches its own entries.
+_auth_status_locks: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[tuple[str, str], _AuthStatusCheck]
+] = weakref.WeakKeyDictionary()
+
+
+def invalidate_session_authenticated(storage_state_path: Path, test_url: str) -> None:
+    _auth_status_cache.pop((str(storage_state_path), test_url), None)
+
 
 async def is_session_authenticated(storage_state_path: Path, test_url: str) -> bool:
     """Check if the stored session is still valid using authentication agent"""
-    if not storage_state_path.exists():
+    # Filesystem calls run in a thread, so they do not stall concurrent agents
+    if not await asyncio.to_thread(storage_state_path.exists):
         return False
 
+    key = (str(storage_state_path), test_url)
+    loop = asyncio.get_running_loop()
+    checks = _auth_status_locks.get(loop)
+    if checks is None:
+        checks = _auth_status_locks[loop] = {}
+    check = checks.get(key)
+    if check is None:
+        check = checks[key] = _AuthStatusCheck()
+    check.users += 1
     try:
-        # Use the authentication agent to check status
-        auth_result = await create_auth_status_agent(
-            test_url=test_url, storage_state_path=storage_state_path, headless=True
-        )
-
-        return auth_result.is_authenticated == "yes"
+        async with check.lock:
+            mtime_ns = (await asyncio.to_thread(storage_state_path.stat)).st_mtime_ns
+            cached = _auth_status_cache.get(key)
+            if (
+                cached is not None
+                and cached[0] == mtime_ns
+                and time.monotonic() - cached[1] < AUTH_STATUS_TTL_SECONDS
+            ):
+                return True
+
+            try:
+                # Use the authentication agent to check status
+                auth_result = await create_auth_status_agent(
+                    test_url=test_url,
+                    storage_state_path=storage_state_path,
+                    headless=True,
+                )
+            except Exception:
+                return False
 
-    except Exception:
-        return False
+            authenticated = auth_result.is_authenticated == "yes"
+            if authenticated:
+                _auth_status_cache[key] = (mtime_ns, time.monotonic())
+            else:
+                _auth_status_cache.pop(key, None)
+            return authenticated
+    finally:
+        # The lock reads as unlocked while queued runs wait to take it, so the entry
+        # is only dropped once no run holds or waits for it
+        check.users -= 1
+        if not check.users:
+            del checks[key]
 
 
 async def create_authenticated_session(
@@ -59,7 +128,9 @@ async def create_authenticated_session(
     print("Creating authenticated session with dynamic element detection...")
 
     # Ensure the storage state directory exists
-    storage_state_path.parent.mkdir(parents=True, exist_ok=True)
+    await asyncio.to_thread(
+        storage_state_path.parent.mkdir, parents=True, exist_ok=True
+    )
 
     # Use the agent-based authentication system
     auth_result = await create_authenticated_session_with_agents(
@@ -80,6 +151,79 @@ async def create_authenticated_session(
     return str(storage_state_path)
 
 
+PLAYWRIGHT_VIEWPORT_SIZE = "1380,1000"
+
+
+PLAYWRIGHT_AGENT_SYSTEM_PROMPT = """You are a web automation assistant using Playwright tools, which has a Auto-wait feature. You should check the tool response carefully after each action to decide the next step. You need to complete the assigned task at your best.
+
+## File Download Protocol
+When downloading files:
+1. Track all downloaded filenames in the "files" array
+2. Download only files directly relevant to the current task
+
+## Error Handling (e.g. TimeoutError)
+- If an action fails, retry at least once and attempt at least two alternative approach before reporting failure
+- If a browser_click fails, attempt to click its parent elements even though they may not be a button, this often resolves issues with nested interactive elements
+
+## Context Management
+- Browser tool calls older than 10 steps are removed from history
+- Always use fresh page snapshots to understand current state rather than relying on historical tool responses
+- Make decisions based on the most recent snapshot and tool results
+
+## UI Interaction Guidelines
+
+### Input Fields
+- **Non-standard inputs**: Some input fields are `<div>` elements with contenteditable attributes
+- Click these elements first to focus them before typing
+
+### Action Pacing
+- Execute **one action per step** to prevent race conditions and crashes
+- Wait for each action to complete before proceeding
+
+### File Upload Actions
+1. Get the latest page snapshot
+2. Use browser_click successfully with the content of tool result containing: "### Modal state
+- [File chooser]: can be handled by the "browser_file_upload" tool". When you cannot see this content, you need to try to click its *parent element*
+3. Then use the browser_file_upload tool to upload files
+4. Otherwise, you should never call the browser_file_upload tool
+
+### Dynamic Content
+- Pages may update asynchronously after interactions
+- Always capture a fresh snapshot after UI interactions to see the current state
+
+"""
+
+PLAYWRIGHT_AGENT_START_URL_PROMPT = """## Starting Context
+The browser session is authenticated for: {start_url}
+Unless the task specifies a different URL, you should start your work at this URL.
+"""
+
+
+def create_playwright_mcp_server(
+    storage_state_path: Path, downloads_path: str | Path
+) -> MCPServerStdio:
+    """Playwright MCP server run as a subprocess, with an isolated headless browser."""
+    program, *program_args = playwright_mcp_command()
+    return MCPServerStdio(
+        program,
+        args=[
+            *program_args,
+            "--storage-state",
+            str(storage_state_path),
+            "--isolated",
+            "--no-sandbox",
+            "--headless",
+            "--output-dir",
+            str(downloads_path),
+            "--viewport-size",
+            PLAYWRIGHT_VIEWPORT_SIZE,
+        ],
+        timeout=30,
+        max_retries=5,
+        process_tool_call=process_tool_call,
+    )
+
+
 class ServerMode(str, Enum):
     EXTERNAL = "external"
     DIRECT = "direct"
@@ -151,14 +295,38 @@ async def generic_browser_agent_playwright(
         ctx.deps.working_dir is not None
     ), "ctx.deps.working_dir is None, cannot process files"
 
+    server_task: Optional[asyncio.Task[PooledMCPServer]] = None
+    run_completed = False
     try:
         # Authentication and storage state only needed for DIRECT mode
         if server_mode == ServerMode.DIRECT:
-            deps_validated = GenericBrowserAgentDeps.model_validate(vars(ctx.deps))
+            deps_validated = (
+                ctx.deps
+                if isinstance(ctx.deps, GenericBrowserAgentDeps)
+                else GenericBrowserAgentDeps.model_validate(vars(ctx.deps))
+            )
             storage_state_path = Path(deps_validated.storage_state_path)
 
             # Ensure storage state directory exists
-            storage_state_path.parent.mkdir(parents=True, exist_ok=True)
+            await asyncio.to_thread(
+                storage_state_path.parent.mkdir, parents=True, exist_ok=True
+            )
+
+            # The MCP server starts while the session is checked. Its browser
+            # context is created from the storage state on the first tool call,
+            # so a session created below is still picked up.
+            server_task = asyncio.create_task(
+                PLAYWRIGHT_MCP_SERVER_POOL.acquire(
+                    (
+                        str(storage_state_path),
+                        str(downloads_path),
+                        PLAYWRIGHT_VIEWPORT_SIZE,
+                    ),
+                    lambda: create_playwright_mcp_server(
+                        storage_state_path, downloads_path
+                    ),
+                )
+            )
 
             # Check if authentication is valid
             if not await is_session_authenticated(storage_state_path, start_url):
@@ -193,25 +361,9 @@ async def generic_browser_agent_playwright(
                 url=mcp_server_url, max_retries=5, process_tool_call=process_tool_call
             )
         else:
-            # Use direct MCP server (spawns the server process)
-            server = MCPServerStdio(
-                "npx",
-                args=[
-                    "@playwright/mcp@0.0.41",
-                    "--storage-state",
-                    str(storage_state_path),
-                    "--isolated",
-                    "--no-sandbox",
-                    "--headless",
-                    "--output-dir",
-                    str(downloads_path),
-                    "--viewport-size",
-                    "1380,1000",
-                ],
-                timeout=30,
-                max_retries=5,
-                process_tool_call=process_tool_call,
-            )
+            # Use direct MCP server, a warm one from the pool when available
+            assert server_task is not None
+            server = (await server_task).server
 
         # Create Pydantic AI agent with Playwright MCP integration
         agent = Agent(
@@ -222,48 +374,12 @@ async def generic_browser_agent_playwright(
             ),  # not all model support the param parallel_tool_calls
             toolsets=[server],
             output_type=GenericBrowserAgentOutput,
-            system_prompt=f"""You are a web automation assistant using Playwright tools, which has a Auto-wait feature. You should check the tool response carefully after each action to decide the next step. You need to complete the assigned task at your best.
-
-## Starting Context
-The browser session is authenticated for: {start_url}
-Unless the task specifies a different URL, you should start your work at this URL.
-
-## File Download Protocol
-When downloading files:
-1. Track all downloaded filenames in the "files" array
-2. Download only files directly relevant to the current task
-
-## Error Handling (e.g. TimeoutError)
-- If an action fails, retry at least once and attempt at least two alternative approach before reporting failure
-- If a browser_click fails, attempt to click its parent elements even though they may not be a button, this often resolves issues with nested interactive elements
-
-## Context Management
-- Browser tool calls older than 10 steps are removed from history
-- Always use fresh page snapshots to understand current state rather than relying on historical tool responses
-- Make decisions based on the most recent snapshot and tool results
-
-## UI Interaction Guidelines
-
-### Input Fields
-- **Non-standard inputs**: Some input fields are `<div>` elements with contenteditable attributes
-- Click these elements first to focus them before typing
-
-### Action Pacing
-- Execute **one action per step** to prevent race conditions and crashes
-- Wait for each action to complete before proceeding
-
-### File Upload Actions
-1. Get the latest page snapshot
-2. Use browser_click successfully with the content of tool result containing: "### Modal state
-- [File chooser]: can be handled by the "browser_file_upload" tool". When you cannot see this content, you need to try to click its *parent element*
-3. Then use the browser_file_upload tool to upload files
-4. Otherwise, you should never call the browser_file_upload tool
-
-### Dynamic Content
-- Pages may update asynchronously after interactions
-- Always capture a fresh snapshot after UI interactions to see the current state
-
-""",
+            # The static prompt comes first, so its prefix is identical across runs
+            # and can be reused by the provider's prompt caching
+            system_prompt=[
+                PLAYWRIGHT_AGENT_SYSTEM_PROMPT,
+                PLAYWRIGHT_AGENT_START_URL_PROMPT.format(start_url=start_url),
+            ],
             deps_type=ActionDeps,
             history_processors=[
                 detect_tool_call_loop_processor,
@@ -307,7 +423,7 @@ When downloading files:
             with logfire.span(f"playwright_{server_mode.lower()}_agent_task"):
                 result = await agent.run(
                     task,
-                    deps=ActionDeps(**vars(ctx.deps)),
+                    deps=ctx.deps.to_action_deps(),
                     usage_limits=UsageLimits(request_limit=70),
                 )
 
@@ -317,6 +433,7 @@ When downloading files:
                 )
 
                 parsed_result = result.output
+        run_completed = True
 
     except Exception as e:
         logfire.error(f"Error in {mode_name} browser agent: {e}")
@@ -327,6 +444,20 @@ When downloading files:
             feedback=f"Browser agent failed with error: {str(e)}",
             execution_flow="Agent execution failed with exception",
         )
+    finally:
+        if server_task is not None:
+            # Also reached when the run failed before it took the server
+            server_task.cancel()
+            (pooled_server,) = await asyncio.gather(server_task, return_exceptions=True)
+            if isinstance(pooled_server, PooledMCPServer):
+                # A server whose run failed may be in a bad state, so it is not reused
+                await PLAYWRIGHT_MCP_SERVER_POOL.release(
+                    pooled_server, reusable=run_completed
+                )
+
+    if server_mode == ServerMode.DIRECT and parsed_result.successful == "no":
+        # The failure may come from an expired session, so the next run checks it again
+        invalidate_session_authenticated(Path(ctx.deps.storage_state_path), start_url)
 
     # if parsed_result.successful == "no":
     #     raise ValueError(
@@ -335,8 +466,8 @@ When downloading files:
 
     # Post-process files if any were downloaded
     if parsed_result.files:
-        parsed_result.files = process_downloaded_files(
-            parsed_result.files, raise_on_missing=True
+        parsed_result.files = await asyncio.to_thread(
+            process_downloaded_files, parsed_result.files, raise_on_missing=True
         )
 
     logfire.info(
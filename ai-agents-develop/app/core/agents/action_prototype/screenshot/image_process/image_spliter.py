@@ -6,6 +6,8 @@ import cv2
 import logfire
 import numpy as np
 
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
 
 def split_image_by_spacing(
     input_image: bytes,
@@ -106,6 +108,15 @@ def save_blocks_as_images(
     successful_saves = 0
     ret = []
     for i, block in enumerate(blocks):
+        filename = os.path.join(work_dir, f"image_{uuid4()}_{screen_id}_{i}.png")
+        if block.startswith(PNG_SIGNATURE):
+            # Screenshots and split blocks are PNG already, write them as they are
+            # instead of decoding and re-encoding them
+            with open(filename, "wb") as f:
+                f.write(block)
+            ret.append(filename)
+            successful_saves += 1
+            continue
         # byte_data = block.encode("latin1")
         byte_data = block
         # Convert bytes back to a numpy array
@@ -114,7 +125,6 @@ def save_blocks_as_images(
         img = cv2.imdecode(img_array, cv2.IMREAD_UNCHANGED)
         if img is not None:
             # Save the image to file
-            filename = os.path.join(work_dir, f"image_{uuid4()}_{screen_id}_{i}.png")
             cv2.imwrite(filename, img)
             ret.append(filename)
             successful_saves += 1
@@ -5,9 +5,9 @@ from typing import List, Literal
 
 from browser_use.browser import BrowserSession
 from pydantic import BaseModel
-from pydantic_ai import Agent, BinaryContent
+from pydantic_ai import BinaryContent
 
-from app.core.llm.pydanticai.openai_model import get_pydanticai_openai_llm
+from app.core.llm.pydanticai.agent_pool import get_agent
 
 
 class ImageSelectionResult(BaseModel):
@@ -54,11 +54,8 @@ async def filter_relevant_screenshots(
         - Ensure the *order of comments* or *events* respects the actual chronological or logical sequence shown.
         - If any numbers are shown, treat them *literally* — do not assume, infer, or "fill in" values not explicitly visible.
         """
-    agent = Agent(
-        model=get_pydanticai_openai_llm(),
-        system_prompt=agent_system_prompt,
-        output_type=ImageSelectionResult,
-    )
+    # The prompt only varies with the date and the number of screenshots
+    agent = get_agent(agent_system_prompt, ImageSelectionResult)
     user_prompt = [
         f"The Information content is: {info_content}. \n and the images are: "
     ]
@@ -69,4 +66,4 @@ async def filter_relevant_screenshots(
     )
 
     result = await agent.run(user_prompt)
-    return ImageSelectionResult.model_validate(result.output)
+    return result.output
@@ -0,0 +1,64 @@
+from io import BytesIO
+
+from PIL import Image
+
+# OpenAI vision models fit images into a 2048x2048 square and then scale the
+# shortest side down to 768px before tiling, so anything larger is only upload.
+VISION_MAX_SIDE = 2048
+VISION_MAX_SHORT_SIDE = 768
+
+
+def prepare_vision_image(
+    image: bytes,
+    max_side: int = VISION_MAX_SIDE,
+    max_short_side: int = VISION_MAX_SHORT_SIDE,
+    quality: int = 80,
+) -> tuple[bytes, str]:
+    """
+    Downscale a screenshot to the size the vision model works with and re-encode it as JPEG.
+
+    Args:
+        image: Image data as bytes (e.g. a PNG screenshot)
+        max_side: Maximum size of the longest side (in pixels)
+        max_short_side: Maximum size of the shortest side (in pixels)
+        quality: JPEG quality
+    Returns:
+        Tuple of (image bytes, media type)
+    """
+    with Image.open(BytesIO(image)) as img:
+        width, height = img.size
+        scale = min(
+            1.0, max_side / max(width, height), max_short_side / min(width, height)
+        )
+        if scale < 1.0:
+            img = img.resize(
+                (max(1, round(width * scale)), max(1, round(height * scale))),
+                Image.Resampling.LANCZOS,
+            )
+        buffer = BytesIO()
+        img.convert("RGB").save(buffer, "JPEG", quality=quality, optimize=True)
+    return buffer.getvalue(), "image/jpeg"
+
+
+def difference_hash(image: bytes, hash_size: int = 16) -> bytes:
+    """
+    Perceptual (difference) hash of an image: near-identical renderings of a page,
+    e.g. differing only by anti-aliasing or a blinking cursor, get the same hash.
+
+    Args:
+        image: Image data as bytes
+        hash_size: Width and height of the hash grid, the hash has hash_size**2 bits
+    Returns:
+        The hash as bytes
+    """
+    with Image.open(BytesIO(image)) as img:
+        small = img.convert("L").resize(
+            (hash_size + 1, hash_size), Image.Resampling.LANCZOS
+        )
+    pixels = small.tobytes()
+    bits = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return bits.to_bytes(hash_size * hash_size // 8, "big")
@@ -69,10 +69,15 @@ async def _retry_filter_screenshots(
 
 
 async def screenshot_action(
-    browser_session: BrowserSession, full_page_screenshot: bool, target_info: str
+    browser_session: BrowserSession,
+    full_page_screenshot: bool,
+    target_info: str,
+    screenshot: bytes | None = None,
 ) -> list[bytes]:
     screenshots = []
-    screenshot = await take_screenshot(browser_session, full_page_screenshot)
+    # Callers that already captured the current page can pass it in
+    if screenshot is None:
+        screenshot = await take_screenshot(browser_session, full_page_screenshot)
     # Old code for splitting images:
     lists_of_screenshots = split_image_by_spacing(input_image=screenshot)
     filtered_screenshots = await _retry_filter_screenshots(
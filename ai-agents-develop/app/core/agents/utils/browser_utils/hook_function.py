@@ -8,6 +8,7 @@ from alltrue.agents.schema.action_execution import (
     S3ScreenshotLog,
 )
 from browser_use import Agent as BrowserUseAgent
+from browser_use.agent.views import AgentHistoryList
 
 from app.core.agents.utils.browser_utils.screenshot_upload import (
     S3ScreenshotUploadResult,
@@ -36,11 +37,25 @@ def generate_model_output_logs(agent: BrowserUseAgent) -> List[LogContent]:
     return logs
 
 
-def generate_screenshot_logs(agent: BrowserUseAgent) -> List[LogContent]:
+def get_history_last_screenshot(history: AgentHistoryList) -> str | None:
+    """
+    Base64 screenshot of the last step in the history, if any.
+
+    browser-use reads every requested screenshot from disk, so only the last one is requested.
+    """
+    screenshots = history.screenshots(n_last=1)
+    return screenshots[-1] if screenshots else None
+
+
+def get_last_screenshot(agent: BrowserUseAgent) -> str | None:
+    """Base64 screenshot of the agent's last step, if any."""
+    return get_history_last_screenshot(agent.history)
+
+
+def upload_screenshot_logs(screenshot_b64: str | None) -> List[LogContent]:
+    """Upload a step screenshot and return the log entries pointing to it."""
     logs: List[LogContent] = []
     try:
-        screenshots = agent.history.screenshots()
-        screenshot_b64 = screenshots[-1] if screenshots else None
         if screenshot_b64:
             upload_result = upload_screenshot(screenshot_b64, context={})
             if isinstance(upload_result, S3ScreenshotUploadResult):
@@ -55,3 +70,7 @@ def generate_screenshot_logs(agent: BrowserUseAgent) -> List[LogContent]:
         logfire.error(f"Error in uploading screenshot: {e}")
         raise
     return logs
+
+
+def generate_screenshot_logs(agent: BrowserUseAgent) -> List[LogContent]:
+    return upload_screenshot_logs(get_last_screenshot(agent))
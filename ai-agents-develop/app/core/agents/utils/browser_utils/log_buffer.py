@@ -0,0 +1,95 @@
+import asyncio
+from collections import deque
+from typing import Callable, List, Union
+
+import logfire
+from alltrue.agents.schema.action_execution import LogContent
+
+from app.core.graph.deps.action_deps import ActionDeps
+
+# Either the logs of a step, or a blocking function that produces them (e.g. by
+# uploading a screenshot), run in a worker thread when the buffer is flushed
+StepLogs = Union[List[LogContent], Callable[[], List[LogContent]]]
+
+
+class StepLogBuffer:
+    """
+    Collects the per-step logs of a browser agent and writes them to the action in
+    the background, so the step loop does not wait on a database round-trip per step.
+
+    Entries are written in batches of up to max_batch, at least every flush_interval
+    seconds. Once max_queue entries are waiting, the oldest ones are dropped.
+    aclose() writes whatever is left and must be awaited before the action status
+    is updated, as both read-modify-write the same record.
+    """
+
+    def __init__(
+        self,
+        deps: ActionDeps,
+        max_batch: int = 64,
+        flush_interval: float = 0.25,
+        max_queue: int = 1024,
+    ):
+        self._deps = deps
+        self._max_batch = max_batch
+        self._flush_interval = flush_interval
+        self._max_queue = max_queue
+        self._queue: deque[StepLogs] = deque()
+        self._wakeup = asyncio.Event()
+        self._closed = False
+        self._task: asyncio.Task | None = None
+
+    def append(self, logs: StepLogs) -> None:
+        if not logs:
+            return
+        if len(self._queue) >= self._max_queue:
+            self._queue.popleft()
+            logfire.warning("Step log buffer is full, dropping the oldest entry")
+        self._queue.append(logs)
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_loop())
+        if len(self._queue) >= self._max_batch:
+            self._wakeup.set()
+
+    async def aclose(self) -> None:
+        self._closed = True
+        if self._task is None:
+            await self._flush()
+            return
+        self._wakeup.set()
+        await self._task
+
+    async def _flush_loop(self) -> None:
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._flush_interval)
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self._flush()
+        await self._flush()
+
+    async def _flush(self) -> None:
+        while self._queue:
+            entries = [
+                self._queue.popleft()
+                for _ in range(min(self._max_batch, len(self._queue)))
+            ]
+            produced = await asyncio.gather(*(self._produce(e) for e in entries))
+            batch = [logs for logs in produced if logs]
+            if not batch:
+                continue
+            try:
+                await self._deps.add_logs(batch)
+            except Exception as e:
+                logfire.error(f"Error writing {len(batch)} step logs: {e}")
+
+    @staticmethod
+    async def _produce(logs: StepLogs) -> List[LogContent]:
+        if not callable(logs):
+            return logs
+        try:
+            return await asyncio.to_thread(logs)
+        except Exception as e:
+            logfire.error(f"Error producing step logs: {e}")
+            return []
@@ -1,12 +1,54 @@
+import json
 import os
 import shlex
+import shutil
 import signal
 import subprocess
 import time
+from functools import cache
+from pathlib import Path
 
 import logfire
 import psutil
 
+PLAYWRIGHT_MCP_VERSION = "0.0.41"
+
+
+@cache
+def playwright_mcp_command(version: str = PLAYWRIGHT_MCP_VERSION) -> tuple[str, ...]:
+    """
+    Command (program and leading args) that starts the Playwright MCP server.
+
+    The image installs @playwright/mcp globally, so when that install has the requested
+    version its CLI is run with node directly, skipping npx's package resolution on
+    every spawn. Otherwise the pinned package is run through npx.
+    """
+    node = shutil.which("node")
+    npm = shutil.which("npm")
+    if node and npm:
+        try:
+            npm_root = subprocess.run(
+                [npm, "root", "-g"],
+                capture_output=True,
+                text=True,
+                check=True,
+                timeout=10,
+            ).stdout.strip()
+            package_dir = Path(npm_root) / "@playwright" / "mcp"
+            package = json.loads((package_dir / "package.json").read_text())
+            bin_entry = package.get("bin")
+            if isinstance(bin_entry, dict):
+                bin_entry = next(iter(bin_entry.values()), None)
+            cli = package_dir / (bin_entry or "cli.js")
+            if package.get("version") == version and cli.is_file():
+                return node, str(cli)
+            logfire.info(
+                f"Global @playwright/mcp is {package.get('version')}, using npx for {version}"
+            )
+        except (subprocess.SubprocessError, OSError, ValueError) as e:
+            logfire.warning(f"Could not locate the global @playwright/mcp install: {e}")
+    return "npx", f"@playwright/mcp@{version}"
+
 
 def get_pid_status(pid: int) -> str:
     """
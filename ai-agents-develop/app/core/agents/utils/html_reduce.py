@@ -0,0 +1,41 @@
+import re
+
+from lxml import etree
+from lxml import html as lxml_html
+
+# Elements that carry no readable page content
+_DROPPED_TAGS = ("script", "style", "svg", "noscript", "template")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def reduce_html(html: str, max_chars: int = 30_000) -> str:
+    """
+    Strip non-content markup from a page's HTML source before it is put into an LLM prompt.
+
+    Drops scripts, styles, SVGs, comments, inline style attributes and data: URIs,
+    collapses whitespace, and truncates the result.
+
+    Args:
+        html: The HTML source of the page
+        max_chars: Maximum length of the returned HTML
+
+    Returns:
+        The reduced HTML source
+    """
+    if not html.strip():
+        return html
+    try:
+        root = lxml_html.fromstring(html)
+    except (etree.ParserError, ValueError):
+        return _WHITESPACE_RE.sub(" ", html)[:max_chars]
+
+    etree.strip_elements(root, *_DROPPED_TAGS, etree.Comment, with_tail=False)
+    for element in root.iter():
+        if not isinstance(element.tag, str):
+            continue
+        for name, value in element.attrib.items():
+            if name == "style" or value.lstrip().startswith("data:"):
+                del element.attrib[name]
+
+    reduced = lxml_html.tostring(root, encoding="unicode")
+    return _WHITESPACE_RE.sub(" ", reduced)[:max_chars]
@@ -5,6 +5,7 @@ from uuid import UUID
 import logfire
 from alltrue.agents.schema.action_execution import (
     ActionExecutionStatus,
+    LogContent,
     LogEntry,
     ObjectLog,
     PlainTextLog,
@@ -39,6 +40,14 @@ class ActionDeps(BaseDeps):
             )
             Path(self.action_working_dir).mkdir(parents=True, exist_ok=True)
 
+    def to_action_deps(self) -> "ActionDeps":
+        """
+        Copy of these deps as a plain ActionDeps. The values were validated when these
+        deps were built, so they are not validated again; fields of subclasses are kept
+        as extra fields.
+        """
+        return ActionDeps.model_construct(**vars(self))
+
     async def add_log(
         self,
         log: Union[PlainTextLog, ObjectLog, List[PlainTextLog | ObjectLog]],
@@ -47,6 +56,14 @@ class ActionDeps(BaseDeps):
         Adds a log entry by fetching the model, updating it, and saving it back.
         """
         logfire.info(f"Adding log", log=log)
+        if not isinstance(log, list):
+            log = [log]
+        await self.add_logs([log])
+
+    async def add_logs(self, logs: List[List[LogContent]]):
+        """
+        Adds several log entries with a single fetch and save of the model.
+        """
         if not self.write_db_log:
             logfire.warning("write_db_log is false, skipping log.")
             return
@@ -58,12 +75,10 @@ class ActionDeps(BaseDeps):
             return
 
         # 2. MODIFY the model object in memory
-        if not isinstance(log, list):
-            log = [log]
-
         # We need to create a proper LogEntry object if that's what your model expects
-        log_entry = LogEntry(content=log)  # Assuming LogEntry structure
-        action_exec.add_log(log_entry)
+        for log in logs:
+            log_entry = LogEntry(content=log)  # Assuming LogEntry structure
+            action_exec.add_log(log_entry)
 
         # 3. UPDATE the repository with the modified object
         await self.action_repo.update(action_exec)
@@ -1,10 +1,15 @@
+from functools import cache
+
 from browser_use.llm import ChatOpenAI
 
+from app.core.llm.http_client import get_openai_http_client
 from app.utils.chatgpt.openai_secret_key import OPENAI_API_KEY
 
 DEFAULT_OPENAI_MODEL = "gpt-4.1"
 
 
+# ChatOpenAI only holds configuration, so one instance per model is shared
+@cache
 def get_browser_use_openai_llm(model_name: str = DEFAULT_OPENAI_MODEL) -> ChatOpenAI:
     if OPENAI_API_KEY is None:
         raise ValueError(
@@ -13,4 +18,5 @@ def get_browser_use_openai_llm(model_name: str = DEFAULT_OPENAI_MODEL) -> ChatOp
     return ChatOpenAI(
         model=model_name,
         api_key=OPENAI_API_KEY,
+        http_client=get_openai_http_client(),
     )
@@ -0,0 +1,109 @@
+import asyncio
+import hashlib
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+# LLM outputs keyed by a digest of the model name and the full request input, so
+# re-auditing the same page (e.g. when the browser agent retries) returns
+# immediately instead of paying another model round-trip.
+LLM_RESPONSE_CACHE_TTL_SECONDS = 3600
+_LLM_RESPONSE_CACHE_MAXSIZE = 10_000
+_llm_response_cache: dict[str, tuple[float, Any]] = {}
+# The cache is shared by the scheduler threads, each running its own event loop
+_llm_response_cache_lock = threading.Lock()
+
+
+@dataclass
+class _InFlightRequest:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    # Callers holding or waiting for the lock; the entry is dropped at zero
+    users: int = 0
+
+
+# One lock per in-flight key, so concurrent identical requests share one call.
+# asyncio locks belong to one event loop, so they are kept per loop, as in
+# app/core/llm/http_client.py; each loop only touches its own entries.
+_llm_response_locks: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[str, _InFlightRequest]
+] = weakref.WeakKeyDictionary()
+
+
+def _get_cached(key: str, now: float) -> tuple[bool, Any]:
+    with _llm_response_cache_lock:
+        cached = _llm_response_cache.get(key)
+    if cached is not None and cached[0] > now:
+        return True, cached[1]
+    return False, None
+
+
+def _put_cached(key: str, value: Any, expires_at: float, now: float) -> None:
+    with _llm_response_cache_lock:
+        if len(_llm_response_cache) >= _LLM_RESPONSE_CACHE_MAXSIZE:
+            # Drop expired entries first, then the oldest one if still full
+            for stale_key in [
+                k
+                for k, (entry_expires_at, _) in _llm_response_cache.items()
+                if entry_expires_at <= now
+            ]:
+                del _llm_response_cache[stale_key]
+            if len(_llm_response_cache) >= _LLM_RESPONSE_CACHE_MAXSIZE:
+                _llm_response_cache.pop(next(iter(_llm_response_cache)))
+        _llm_response_cache[key] = (expires_at, value)
+
+
+def _loop_in_flight_requests() -> dict[str, _InFlightRequest]:
+    loop = asyncio.get_running_loop()
+    in_flight_requests = _llm_response_locks.get(loop)
+    if in_flight_requests is None:
+        in_flight_requests = _llm_response_locks[loop] = {}
+    return in_flight_requests
+
+
+async def cached_agent_run(
+    key_material: bytes,
+    runner: Callable[[], Awaitable[T]],
+    model_name: str,
+    ttl: int = LLM_RESPONSE_CACHE_TTL_SECONDS,
+) -> T:
+    """
+    Return the cached output for key_material, or await runner() and cache its output.
+
+    Args:
+        key_material: Bytes that fully identify the request (prompt parts, images).
+        runner: Coroutine factory that runs the agent and returns its output.
+        model_name: Name of the model that serves the request, part of the key.
+        ttl: Seconds to keep the output.
+    """
+    key = hashlib.sha256(model_name.encode("utf-8") + b"|" + key_material).hexdigest()
+    hit, value = _get_cached(key, time.monotonic())
+    if hit:
+        return value
+
+    in_flight_requests = _loop_in_flight_requests()
+    in_flight = in_flight_requests.get(key)
+    if in_flight is None:
+        in_flight = in_flight_requests[key] = _InFlightRequest()
+    in_flight.users += 1
+    try:
+        async with in_flight.lock:
+            # Another caller may have filled the entry while we were waiting
+            now = time.monotonic()
+            hit, value = _get_cached(key, now)
+            if hit:
+                return value
+
+            value = await runner()
+            now = time.monotonic()
+            _put_cached(key, value, now + ttl, now)
+            return value
+    finally:
+        # The lock reads as unlocked while queued callers wait to take it, so the
+        # entry is only dropped once no caller holds or waits for it
+        in_flight.users -= 1
+        if not in_flight.users:
+            del in_flight_requests[key]
@@ -0,0 +1,66 @@
+import asyncio
+import weakref
+from functools import cache
+
+import httpx
+
+_OPENAI_HTTP_LIMITS = httpx.Limits(max_connections=256, max_keepalive_connections=64)
+
+
+class _LoopBoundTransport(httpx.AsyncBaseTransport):
+    """
+    Keeps one HTTP/2 connection pool per event loop.
+
+    Pooled connections belong to the loop that opened them. The scheduler runs each
+    control execution in its own loop (asyncio.run in a worker thread) while FastAPI
+    background tasks run on the main loop, so a single pool would hand out
+    connections bound to a closed or foreign loop.
+    """
+
+    def __init__(self) -> None:
+        self._transports: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport
+        ] = weakref.WeakKeyDictionary()
+
+    def _get_transport(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        transport = self._transports.get(loop)
+        if transport is None:
+            transport = httpx.AsyncHTTPTransport(http2=True, limits=_OPENAI_HTTP_LIMITS)
+            self._transports[loop] = transport
+        return transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._get_transport().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        """Close the pool of the running loop; pools of other loops stay open."""
+        transport = self._transports.pop(asyncio.get_running_loop(), None)
+        if transport is not None:
+            await transport.aclose()
+
+
+_openai_transport = _LoopBoundTransport()
+
+
+@cache
+def get_openai_http_client() -> httpx.AsyncClient:
+    """
+    HTTP/2 client shared by every OpenAI client in the process (pydantic-ai and
+    browser-use), so concurrent model calls reuse a few warm connections instead
+    of each opening its own TLS connection. Connections are pooled per event loop.
+    """
+    return httpx.AsyncClient(
+        transport=_openai_transport,
+        timeout=httpx.Timeout(timeout=600, connect=5),
+    )
+
+
+async def close_openai_http_connections() -> None:
+    """
+    Close the pooled OpenAI connections of the running event loop.
+
+    Call this before a loop that made model calls ends (e.g. at the end of an
+    asyncio.run), so its connections are shut down instead of leaked.
+    """
+    await _openai_transport.aclose()
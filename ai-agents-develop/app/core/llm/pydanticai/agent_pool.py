@@ -0,0 +1,22 @@
+from functools import lru_cache
+from typing import Any
+
+from pydantic_ai import Agent
+
+from app.core.llm.pydanticai.openai_model import (
+    DEFAULT_OPENAI_MODEL,
+    get_pydanticai_openai_llm,
+)
+
+
+# An Agent keeps no state between runs, so helpers that used to build one per call
+# share one per (system prompt, output type, model) and build its output schema once
+@lru_cache(maxsize=32)
+def get_agent(
+    system_prompt: str, output_type: Any = str, model_name: str = DEFAULT_OPENAI_MODEL
+) -> Agent:
+    return Agent(
+        model=get_pydanticai_openai_llm(model_name),
+        system_prompt=system_prompt,
+        output_type=output_type,
+    )
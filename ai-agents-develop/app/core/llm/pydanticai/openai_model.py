@@ -1,11 +1,24 @@
+import json
+from functools import cache
+
 from pydantic_ai.models.openai import OpenAIModel, OpenAIModelSettings
 from pydantic_ai.providers.openai import OpenAIProvider
 
+from app.core.llm.http_client import get_openai_http_client
 from app.utils.chatgpt.openai_secret_key import OPENAI_API_KEY
 
 DEFAULT_OPENAI_MODEL = "gpt-5.1"
 
 
+@cache
+def _get_openai_provider() -> OpenAIProvider:
+    return OpenAIProvider(api_key=OPENAI_API_KEY, http_client=get_openai_http_client())
+
+
+# Models keyed by (model name, serialized model kwargs), shared by every agent
+_openai_models: dict[tuple[str, str], OpenAIModel] = {}
+
+
 # gpt-5.1 by defaullt reasoning effort is set to "none"
 def get_pydanticai_openai_llm(
     model_name: str = DEFAULT_OPENAI_MODEL, model_kwargs: dict | None = None
@@ -16,13 +29,19 @@ def get_pydanticai_openai_llm(
         )
     if model_kwargs is None:
         model_kwargs = {}
-    return OpenAIModel(
-        model_name=model_name,
-        provider=OpenAIProvider(api_key=OPENAI_API_KEY),
-        settings=OpenAIModelSettings(
-            **{
-                "temperature": 0.0,
-                **model_kwargs,
-            }
-        ),
-    )
+    # model_kwargs may hold nested dicts, so it is keyed by its JSON form
+    key = (model_name, json.dumps(model_kwargs, sort_keys=True, default=str))
+    model = _openai_models.get(key)
+    if model is None:
+        model = OpenAIModel(
+            model_name=model_name,
+            provider=_get_openai_provider(),
+            settings=OpenAIModelSettings(
+                **{
+                    "temperature": 0.0,
+                    **model_kwargs,
+                }
+            ),
+        )
+        _openai_models[key] = model
+    return model
@@ -0,0 +1,48 @@
+import asyncio
+from typing import Any
+
+import openai
+from pydantic_ai import Agent
+from pydantic_ai.agent import AgentRunResult
+from pydantic_ai.exceptions import ModelHTTPError
+from tenacity import (
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
+
+# Hard deadline for a single model call, so a stuck request cannot hang a run
+LLM_CALL_TIMEOUT_SECONDS = 60.0
+LLM_CALL_MAX_ATTEMPTS = 5
+
+
+def _is_transient_error(error: BaseException) -> bool:
+    """Rate limits, server errors, connection errors and deadlines are worth retrying."""
+    if isinstance(error, ModelHTTPError):
+        return error.status_code == 429 or error.status_code >= 500
+    return isinstance(error, (TimeoutError, openai.APIConnectionError))
+
+
+@retry(
+    retry=retry_if_exception(_is_transient_error),
+    wait=wait_exponential_jitter(initial=1, max=30),
+    stop=stop_after_attempt(LLM_CALL_MAX_ATTEMPTS),
+    reraise=True,
+)
+async def run_agent_with_retry(
+    agent: Agent,
+    user_prompt: Any,
+    timeout: float = LLM_CALL_TIMEOUT_SECONDS,
+    **kwargs: Any,
+) -> AgentRunResult:
+    """
+    Run the agent with a per-attempt deadline, retrying transient model errors with jittered exponential backoff.
+
+    Args:
+        agent: The agent to run.
+        user_prompt: The user prompt passed to agent.run.
+        timeout: Seconds one attempt may take before it is cancelled and retried.
+        **kwargs: Passed through to agent.run.
+    """
+    return await asyncio.wait_for(agent.run(user_prompt, **kwargs), timeout=timeout)
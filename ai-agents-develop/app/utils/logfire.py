@@ -29,3 +29,19 @@ def set_logfire_token_env_variables() -> None:
     # set the service name
     os.environ["LOGFIRE_SERVICE_NAME"] = config.SERVICE_NAME
     os.environ["LOGFIRE_CONSOLE"] = "False"
+
+
+# logfire exports spans through the OpenTelemetry BatchSpanProcessor, which reads
+# its queue and batching settings from these variables when it is created.
+LOGFIRE_BATCH_EXPORT_ENV_DEFAULTS = {
+    "OTEL_BSP_MAX_QUEUE_SIZE": "2048",
+    "OTEL_BSP_MAX_EXPORT_BATCH_SIZE": "512",
+    "OTEL_BSP_SCHEDULE_DELAY": "200",
+    "OTEL_BSP_EXPORT_TIMEOUT": "5000",
+}
+
+
+def set_logfire_batch_export_env_variables() -> None:
+    """Set the span batching defaults, must be called before logfire.configure."""
+    for name, value in LOGFIRE_BATCH_EXPORT_ENV_DEFAULTS.items():
+        os.environ.setdefault(name, value)
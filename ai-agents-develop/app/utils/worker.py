@@ -12,6 +12,7 @@ from app.api.services.remote_update_service import ControlPlaneUpdateService
 from app.core.models.models import ActionExecution, ControlExecution
 from app.core.registry import ensure_registry_loaded
 from app.utils.file_storage_manager import get_file_storage
+from app.utils.logfire import set_logfire_batch_export_env_variables
 from config import AGENTS_EVIDENCE_STORAGE_BUCKET, CONTROL_PLANE_EVENT_HANDLER_ENABLED
 
 _WORKER_INITIALIZED_LOCK = threading.Lock()
@@ -47,6 +48,7 @@ def initialize_worker_dependencies():
         get_file_storage(AGENTS_EVIDENCE_STORAGE_BUCKET)
 
         # Configure logfire
+        set_logfire_batch_export_env_variables()
         logfire.configure(
             send_to_logfire="if-token-present",
             scrubbing=False,
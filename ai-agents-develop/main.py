@@ -15,9 +15,13 @@ import re
 import logfire
 from logfire import ConsoleOptions
 
-from app.utils.logfire import set_logfire_token_env_variables
+from app.utils.logfire import (
+    set_logfire_batch_export_env_variables,
+    set_logfire_token_env_variables,
+)
 
 set_logfire_token_env_variables()
+set_logfire_batch_export_env_variables()
 
 logfire.configure(
     send_to_logfire="if-token-present",
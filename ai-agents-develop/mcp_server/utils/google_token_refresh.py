@@ -1,4 +1,6 @@
+import hashlib
 import json
+import time
 
 from google.auth.exceptions import RefreshError
 from google.auth.transport.requests import Request
@@ -53,6 +55,43 @@ def get_refreshed_credentials_json(token_json_str: str) -> str:
     return creds.to_json()
 
 
+# Refreshed credentials keyed by a digest of the input token, so repeated runs
+# with the same token skip the OAuth round-trip. Access tokens live ~60 min.
+REFRESHED_CREDENTIALS_TTL_SECONDS = 1800
+_REFRESHED_CREDENTIALS_MAXSIZE = 256
+_refreshed_credentials_cache: dict[str, tuple[float, str]] = {}
+
+
+def get_cached_refreshed_credentials_json(token_json_str: str) -> str:
+    """
+    Same as get_refreshed_credentials_json, but reuses the result for the same
+    input token for up to REFRESHED_CREDENTIALS_TTL_SECONDS.
+    """
+    key = hashlib.blake2b(token_json_str.encode("utf-8"), digest_size=16).hexdigest()
+    now = time.monotonic()
+    cached = _refreshed_credentials_cache.get(key)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    refreshed_credentials_json = get_refreshed_credentials_json(token_json_str)
+
+    if len(_refreshed_credentials_cache) >= _REFRESHED_CREDENTIALS_MAXSIZE:
+        # Drop expired entries first, then the oldest one if still full
+        for stale_key in [
+            k
+            for k, (expires_at, _) in _refreshed_credentials_cache.items()
+            if expires_at <= now
+        ]:
+            del _refreshed_credentials_cache[stale_key]
+        if len(_refreshed_credentials_cache) >= _REFRESHED_CREDENTIALS_MAXSIZE:
+            _refreshed_credentials_cache.pop(next(iter(_refreshed_credentials_cache)))
+    _refreshed_credentials_cache[key] = (
+        now + REFRESHED_CREDENTIALS_TTL_SECONDS,
+        refreshed_credentials_json,
+    )
+    return refreshed_credentials_json
+
+
 # --- Example Usage (Requires installing google-auth and google-auth-oauthlib) ---
 if __name__ == "__main__":
     from test_suite.credential import GOOGLE_CREDENTIALS
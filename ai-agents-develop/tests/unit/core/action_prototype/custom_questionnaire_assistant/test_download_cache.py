@@ -0,0 +1,91 @@
+from uuid import uuid4
+
+import pytest
+
+from app.core.agents.action_prototype.custom_questionnaire_assistant import tool
+
+URL = "https://example.com/policy.txt"
+
+
+@pytest.fixture(autouse=True)
+def clear_download_cache():
+    tool._download_cache.clear()
+    yield
+    tool._download_cache.clear()
+
+
+async def test_download_is_reused_within_one_run(mocker):
+    run_id = uuid4()
+    download = mocker.patch.object(
+        tool, "_decode_context_document", return_value="policy"
+    )
+    mocker.patch.object(tool.aiohttp, "ClientSession", _FakeSession)
+
+    assert await tool.download_context_document(URL, run_id) == "policy"
+    assert await tool.download_context_document(URL, run_id) == "policy"
+    assert download.call_count == 1
+
+
+async def test_download_is_not_shared_across_runs(mocker):
+    download = mocker.patch.object(
+        tool, "_decode_context_document", side_effect=["first", "edited"]
+    )
+    mocker.patch.object(tool.aiohttp, "ClientSession", _FakeSession)
+
+    assert await tool.download_context_document(URL, uuid4()) == "first"
+    assert await tool.download_context_document(URL, uuid4()) == "edited"
+    assert download.call_count == 2
+
+
+async def test_download_without_run_id_is_not_cached(mocker):
+    mocker.patch.object(tool, "_decode_context_document", return_value="policy")
+    mocker.patch.object(tool.aiohttp, "ClientSession", _FakeSession)
+
+    await tool.download_context_document(URL)
+    assert tool._download_cache == {}
+
+
+def test_json_is_passed_on_as_text():
+    assert tool._decode_context_document(b'{"a": [1, 2]}') == '{"a": [1, 2]}'
+
+
+def test_stray_invalid_bytes_are_replaced():
+    assert (
+        tool._decode_context_document(b"caf\xe9 access policy")
+        == "caf\ufffd access policy"
+    )
+
+
+@pytest.mark.parametrize("payload", [b"%PDF\x00\x01", bytes(range(0x80, 0x100))])
+def test_binary_payloads_are_not_decoded(payload):
+    assert tool._decode_context_document(payload) == (
+        f"Binary file downloaded ({len(payload)} bytes) - unable to display as text"
+    )
+
+
+class _FakeResponse:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    async def read(self) -> bytes:
+        return b"policy"
+
+
+class _FakeSession:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def get(self, url):
+        return _FakeResponse()
@@ -0,0 +1,110 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.core.agents.action_prototype.custom_questionnaire_assistant_v2 import tool
+from app.core.graph.deps.base_deps import ControlInfo
+
+
+def _control_info(customer_id=None, entity_id=None) -> ControlInfo:
+    return ControlInfo(
+        customer_id=customer_id or uuid4(),
+        control_id=uuid4(),
+        control_execution_id=uuid4(),
+        entity_id=entity_id or uuid4(),
+    )
+
+
+def _key(
+    control_info,
+    account_id="account",
+    goal="Answer the questions",
+    revision="sheet:1|doc:1",
+):
+    return tool._response_cache_key(
+        control_info, account_id, "Questionnaire", "Policy", goal, revision
+    )
+
+
+def test_same_inputs_give_the_same_key():
+    control_info = _control_info()
+    assert _key(control_info) == _key(control_info)
+
+
+def test_key_is_not_shared_across_customers_entities_or_accounts():
+    customer_id, entity_id = uuid4(), uuid4()
+    keys = {
+        _key(_control_info(customer_id, entity_id)),
+        _key(_control_info(uuid4(), entity_id)),
+        _key(_control_info(customer_id, uuid4())),
+        _key(_control_info(customer_id, entity_id), account_id="other"),
+    }
+    assert len(keys) == 4
+
+
+def test_key_changes_with_the_drive_revision():
+    control_info = _control_info()
+    assert _key(control_info) != _key(control_info, revision="sheet:2|doc:1")
+
+
+def test_key_changes_with_the_goal():
+    control_info = _control_info()
+    assert _key(control_info) != _key(control_info, goal="Other goal")
+
+
+@pytest.fixture
+def drive(mocker):
+    drive = mocker.MagicMock()
+    drive.about().get().execute.return_value = {"user": {"permissionId": "account"}}
+    mocker.patch.object(tool, "_drive_service", return_value=drive)
+    return drive
+
+
+def test_lookup_fingerprints_the_file_the_export_picks(drive):
+    drive.files().list().execute.side_effect = [
+        {"files": [{"id": "sheet", "modifiedTime": "t1"}, {"id": "older-sheet"}]},
+        {"files": [{"id": "doc", "modifiedTime": "t2"}]},
+    ]
+
+    account_id, revision = tool._drive_cache_lookup(
+        "token",
+        [
+            ("Questionnaire", tool.SPREADSHEET_MIME_TYPE),
+            ("Policy", tool.DOCUMENT_MIME_TYPE),
+        ],
+    )
+
+    assert account_id == "account"
+    # Same fingerprint as the one built from the files prefetch_inputs exports
+    assert revision == tool._drive_revision([("sheet", "t1"), ("doc", "t2")])
+    assert drive.files().list.call_args_list[-1].kwargs["q"] == (
+        tool._drive_file_query("Policy", tool.DOCUMENT_MIME_TYPE)
+    )
+
+
+def test_lookup_fails_when_a_file_is_missing(drive):
+    drive.files().list().execute.return_value = {"files": []}
+    with pytest.raises(FileNotFoundError, match="'Policy' not found"):
+        tool._drive_cache_lookup("token", [("Policy", tool.DOCUMENT_MIME_TYPE)])
+
+
+async def test_empty_cache_skips_the_drive_lookup(mocker, tmp_path):
+    mocker.patch.dict(tool._response_cache, clear=True)
+    lookup = mocker.patch.object(tool, "_drive_cache_lookup")
+    mocker.patch.object(
+        tool, "google_drive_toolset", side_effect=RuntimeError("drive unavailable")
+    )
+    ctx = SimpleNamespace(
+        deps=SimpleNamespace(
+            control_info=_control_info(),
+            working_dir=str(tmp_path),
+            add_log=mocker.AsyncMock(),
+        )
+    )
+
+    with pytest.raises(RuntimeError, match="drive unavailable"):
+        await tool.custom_questionnaire_assistant_v2(
+            ctx, "token", "Questionnaire", "Policy", "Answer the questions"
+        )
+    lookup.assert_not_called()
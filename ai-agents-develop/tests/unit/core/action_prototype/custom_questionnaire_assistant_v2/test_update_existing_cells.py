@@ -0,0 +1,97 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+from pydantic_ai import ModelRetry
+
+from app.core.agents.action_prototype.custom_questionnaire_assistant_v2.tool import (
+    UpdateCellsInput,
+    _validate_updates,
+    update_existing_cells,
+)
+
+
+def _ctx(df: pd.DataFrame, working_dir: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        deps=SimpleNamespace(
+            original_dataframe=df,
+            pending_columns=[],
+            context_content="context",
+            working_dir=working_dir,
+        )
+    )
+
+
+async def test_numbers_not_updated_stay_numbers(tmp_path):
+    df = pd.DataFrame(
+        {
+            "question": ["Q1", "Q2", "Q3"],
+            "score": [1.5, 2.0, np.nan],
+        }
+    )
+
+    result = await update_existing_cells(
+        _ctx(df, str(tmp_path)),
+        [UpdateCellsInput(column_index=2, values=["n/a"], start_row_position=3)],
+    )
+
+    rows = list(
+        load_workbook(result.modified_spreadsheet.file_path).active.iter_rows(
+            values_only=True
+        )
+    )
+    assert rows == [("Q1", 1.5), ("Q2", 2), ("Q3", "n/a")]
+
+
+async def test_empty_answer_column_is_filled(tmp_path):
+    df = pd.DataFrame({"question": ["Q1", "Q2"], "answer": [np.nan, np.nan]})
+
+    result = await update_existing_cells(
+        _ctx(df, str(tmp_path)),
+        [UpdateCellsInput(column_index=2, values=["Yes", "No"], start_row_position=1)],
+    )
+
+    assert result.questions_answered == 2
+    assert df["answer"].tolist() == ["Yes", "No"]
+
+
+@pytest.mark.parametrize(
+    "update, message",
+    [
+        (UpdateCellsInput(column_index=0, values=["a"]), "Column index 0 is invalid"),
+        (UpdateCellsInput(column_index=3, values=["a"]), "Column index 3 is invalid"),
+        (
+            UpdateCellsInput(column_index=1, values=["a"], start_row_position=0),
+            "start_row_position must be at least 1",
+        ),
+        (
+            UpdateCellsInput(column_index=2, values=["a", "b"], start_row_position=3),
+            "Cannot insert 2 values starting at row 3 of column 2",
+        ),
+    ],
+)
+def test_validate_updates_rejects_out_of_range_updates(update, message):
+    # More rows than columns, so rows and columns cannot be mixed up
+    df = pd.DataFrame({"question": ["Q1", "Q2", "Q3"], "answer": [np.nan] * 3})
+    valid = UpdateCellsInput(column_index=2, values=["Yes"])
+    with pytest.raises(ModelRetry, match=message):
+        _validate_updates([valid, update], df)
+
+
+def test_validate_updates_accepts_updates_that_fit():
+    df = pd.DataFrame({"question": ["Q1", "Q2", "Q3"], "answer": [np.nan] * 3})
+    _validate_updates(
+        [
+            UpdateCellsInput(column_index=2, values=["Yes", "No", "Yes"]),
+            UpdateCellsInput(column_index=1, values=["Q3"], start_row_position=3),
+        ],
+        df,
+    )
+
+
+def test_validate_updates_requires_an_update():
+    df = pd.DataFrame({"question": ["Q1"]})
+    with pytest.raises(ModelRetry, match="No updates were provided"):
+        _validate_updates([], df)
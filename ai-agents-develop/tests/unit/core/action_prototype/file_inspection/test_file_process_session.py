@@ -0,0 +1,101 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.agents.action_prototype.file_inspection import tools
+
+
+class _FakeManager:
+    def __init__(self):
+        self.uploads: list[str] = []
+        self.executions = 0
+        self.running = 0
+        self.max_running = 0
+        self.downloads: list[str] = []
+        self.container_files = [
+            {"id": "generated-1", "name": "report.csv", "path": "/mnt/data/report.csv"}
+        ]
+
+    async def start(self):
+        pass
+
+    async def upload_files(self, file_paths):
+        self.uploads.extend(str(path) for path in file_paths)
+        return [f"uploaded-{path.name}" for path in file_paths]
+
+    async def execute_code(self, prompt, verbosity=None, effort=None):
+        self.executions += 1
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        return SimpleNamespace(status="completed", output_text=prompt[-20:])
+
+    async def list_files(self):
+        return self.container_files
+
+    async def download_file(self, destination_dir, custom_name, file_id):
+        self.downloads.append(file_id)
+
+    async def cleanup(self):
+        pass
+
+
+@pytest.fixture
+def manager(mocker, tmp_path):
+    manager = _FakeManager()
+    mocker.patch.object(tools, "CodeInterpreterResponseManager", return_value=manager)
+    yield manager
+    tools._file_process_sessions.clear()
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\n1,2\n")
+    return str(path)
+
+
+async def test_identical_calls_share_one_execution(manager, tmp_path, data_file):
+    outputs = await asyncio.gather(
+        tools.run_file_process(str(tmp_path), [data_file], "sum the columns"),
+        tools.run_file_process(str(tmp_path), [data_file], "sum the columns"),
+    )
+    assert outputs[0] == outputs[1]
+    assert manager.executions == 1
+
+
+async def test_different_calls_run_concurrently(manager, tmp_path, data_file):
+    await asyncio.gather(
+        tools.run_file_process(str(tmp_path), [data_file], "sum the columns"),
+        tools.run_file_process(str(tmp_path), [data_file], "count the rows"),
+    )
+    assert manager.executions == 2
+    assert manager.max_running == 2
+    # The file is uploaded once for both calls
+    assert manager.uploads == [data_file]
+
+
+async def test_generated_files_are_downloaded_once(manager, tmp_path, data_file):
+    await tools.run_file_process(str(tmp_path), [data_file], "sum the columns")
+    await tools.run_file_process(str(tmp_path), [data_file], "count the rows")
+    assert manager.downloads == ["generated-1"]
+
+    # A file replaced at the same path is downloaded again
+    manager.container_files = [
+        {"id": "generated-2", "name": "report.csv", "path": "/mnt/data/report.csv"}
+    ]
+    await tools.run_file_process(str(tmp_path), [data_file], "average the rows")
+    assert manager.downloads == ["generated-1", "generated-2"]
+
+
+async def test_close_cancels_pending_calls(manager, tmp_path, data_file):
+    task = asyncio.create_task(
+        tools.run_file_process(str(tmp_path), [data_file], "sum the columns")
+    )
+    await asyncio.sleep(0)
+    await tools.close_file_process_session(str(tmp_path))
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert str(tmp_path) not in tools._file_process_sessions
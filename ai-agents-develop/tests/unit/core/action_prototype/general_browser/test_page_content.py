@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+
+from app.core.agents.action_prototype.general_browser.tool import GeneralBrowserRun
+
+
+class _FakeBrowserSession:
+    """Serves the main frame of one tab the way the CDP Page domain does."""
+
+    def __init__(self):
+        self.frame = {"loaderId": "loader-1", "url": "https://example.com/"}
+
+    async def get_or_create_cdp_session(self, focus: bool = True):
+        async def get_frame_tree(session_id):
+            return {"frameTree": {"frame": dict(self.frame)}}
+
+        return SimpleNamespace(
+            target_id="target-1",
+            session_id="session-1",
+            cdp_client=SimpleNamespace(
+                send=SimpleNamespace(Page=SimpleNamespace(getFrameTree=get_frame_tree))
+            ),
+        )
+
+
+class _CountingPage:
+    def __init__(self):
+        self.html = "<p>first</p>"
+        self.content_calls = 0
+
+    async def content(self) -> str:
+        self.content_calls += 1
+        return self.html
+
+
+async def test_unchanged_page_is_read_once_per_step():
+    browser_run = GeneralBrowserRun(working_dir="")
+    browser_session, page = _FakeBrowserSession(), _CountingPage()
+
+    first = await browser_run.page_content(browser_session, page)
+    assert await browser_run.page_content(browser_session, page) == first
+    assert page.content_calls == 1
+
+
+async def test_navigation_reads_the_page_again():
+    browser_run = GeneralBrowserRun(working_dir="")
+    browser_session, page = _FakeBrowserSession(), _CountingPage()
+    await browser_run.page_content(browser_session, page)
+
+    # A new document, then a same-document navigation
+    page.html = "<p>second</p>"
+    browser_session.frame["loaderId"] = "loader-2"
+    assert await browser_run.page_content(browser_session, page) == "<p>second</p>"
+    page.html = "<p>third</p>"
+    browser_session.frame["url"] = "https://example.com/#details"
+    assert await browser_run.page_content(browser_session, page) == "<p>third</p>"
+    assert page.content_calls == 3
+
+
+async def test_dom_changes_are_read_in_the_next_step():
+    browser_run = GeneralBrowserRun(working_dir="")
+    browser_session, page = _FakeBrowserSession(), _CountingPage()
+    await browser_run.page_content(browser_session, page)
+
+    page.html = "<p>changed in place</p>"
+    browser_run.end_step()
+    assert (
+        await browser_run.page_content(browser_session, page)
+        == "<p>changed in place</p>"
+    )
@@ -0,0 +1,61 @@
+from app.core.agents.action_prototype.generic_auditor_agent.supervisor_tools.browser_info import (
+    BrowserInfo,
+    screenshot_digest,
+)
+
+URL = "https://example.com/settings"
+
+
+def test_identical_screenshot_is_recorded_once():
+    browser_info = BrowserInfo()
+    digest = screenshot_digest([b"png-1", b"png-2"])
+
+    # Every save gets new file names, only the image bytes repeat
+    browser_info.add_screenshot_info(URL, ["image_a_0.png"], "MFA enabled", digest)
+    assert browser_info.has_screenshot(URL, "MFA enabled", digest)
+    browser_info.add_screenshot_info(URL, ["image_b_0.png"], "MFA enabled", digest)
+
+    assert len(browser_info.screenshot_info) == 1
+    assert browser_info.screenshot_info[0].stored_images == ["image_a_0.png"]
+
+
+def test_changed_screenshot_or_target_is_recorded():
+    browser_info = BrowserInfo()
+    first = screenshot_digest([b"png-1"])
+    changed = screenshot_digest([b"png-2"])
+
+    browser_info.add_screenshot_info(URL, ["a.png"], "MFA enabled", first)
+    browser_info.add_screenshot_info(URL, ["b.png"], "MFA enabled", changed)
+    browser_info.add_screenshot_info(URL, ["c.png"], "SSO enabled", first)
+
+    assert len(browser_info.screenshot_info) == 3
+
+
+def test_screenshot_digest_depends_on_block_boundaries():
+    assert screenshot_digest([b"ab", b"c"]) != screenshot_digest([b"a", b"bc"])
+
+
+def test_screenshot_without_digest_is_always_recorded():
+    browser_info = BrowserInfo()
+
+    browser_info.add_screenshot_info(URL, ["a.png"])
+    browser_info.add_screenshot_info(URL, ["a.png"])
+
+    assert len(browser_info.screenshot_info) == 2
+
+
+def test_repeated_audit_result_is_recorded_once():
+    browser_info = BrowserInfo()
+
+    browser_info.add_check_info(URL, "yes", "MFA is enforced")
+    browser_info.extend_check_info(
+        [
+            {"url": URL, "pass_or_not": "yes", "reason": "MFA is enforced"},
+            {"url": URL, "pass_or_not": "no", "reason": "SSO is disabled"},
+        ]
+    )
+
+    assert [info.reason for info in browser_info.check_info] == [
+        "MFA is enforced",
+        "SSO is disabled",
+    ]
@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+
+from app.core.agents.action_prototype.generic_browser_agent.browser_pool import (
+    MCPServerPool,
+    MCPServerPoolException,
+)
+
+
+class _FakeServer:
+    def __init__(self, fail_on_start: bool = False):
+        self.fail_on_start = fail_on_start
+        self.running = False
+        self.tool_calls: list[str] = []
+
+    async def __aenter__(self):
+        if self.fail_on_start:
+            raise RuntimeError("npx not found")
+        self.running = True
+        return self
+
+    async def __aexit__(self, *exc):
+        self.running = False
+
+    async def direct_call_tool(self, name, args):
+        self.tool_calls.append(name)
+
+
+class _ServerFactory:
+    def __init__(self):
+        self.servers: list[_FakeServer] = []
+
+    def __call__(self) -> _FakeServer:
+        server = _FakeServer()
+        self.servers.append(server)
+        return server
+
+
+async def test_released_server_is_reused_for_the_same_key():
+    pool = MCPServerPool()
+    create_server = _ServerFactory()
+
+    pooled = await pool.acquire("storage-a", create_server)
+    await pool.release(pooled)
+    assert await pool.acquire("storage-a", create_server) is pooled
+    assert len(create_server.servers) == 1
+    # The browser is closed before the server goes back to the pool
+    assert create_server.servers[0].tool_calls == ["browser_close"]
+    pooled.close()
+
+
+async def test_other_key_gets_its_own_server():
+    pool = MCPServerPool()
+    create_server = _ServerFactory()
+
+    pooled = await pool.acquire("storage-a", create_server)
+    await pool.release(pooled)
+    other = await pool.acquire("storage-b", create_server)
+    assert other is not pooled
+    assert len(create_server.servers) == 2
+    other.close()
+    pooled.close()
+
+
+async def test_unusable_server_is_shut_down():
+    pool = MCPServerPool()
+    create_server = _ServerFactory()
+
+    pooled = await pool.acquire("storage-a", create_server)
+    await pool.release(pooled, reusable=False)
+    await pooled.owner
+    assert not create_server.servers[0].running
+    replacement = await pool.acquire("storage-a", create_server)
+    assert replacement is not pooled
+    replacement.close()
+
+
+async def test_failed_start_raises():
+    pool = MCPServerPool()
+    with pytest.raises(MCPServerPoolException):
+        await pool.acquire("storage-a", lambda: _FakeServer(fail_on_start=True))
+
+
+def test_servers_are_not_shared_across_event_loops():
+    pool = MCPServerPool()
+    create_server = _ServerFactory()
+
+    async def acquire_and_release():
+        pooled = await pool.acquire("storage-a", create_server)
+        await pool.release(pooled)
+        return pooled
+
+    first_loop = asyncio.new_event_loop()
+    try:
+        first = first_loop.run_until_complete(acquire_and_release())
+        # The idle server is still running on the first loop, but a run on another
+        # loop must not get it
+        second = asyncio.run(acquire_and_release())
+        assert second is not first
+        assert len(create_server.servers) == 2
+
+        first.close()
+        first_loop.run_until_complete(first.owner)
+    finally:
+        first_loop.close()
+
+
+async def test_server_can_be_closed_from_another_thread():
+    pool = MCPServerPool()
+    create_server = _ServerFactory()
+
+    pooled = await pool.acquire("storage-a", create_server)
+    await asyncio.to_thread(pooled.close)
+    await pooled.owner
+    assert not create_server.servers[0].running
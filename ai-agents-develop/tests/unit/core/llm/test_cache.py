@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+from app.core.llm import cache
+from app.core.llm.cache import cached_agent_run
+
+MODEL = "gpt-test"
+
+
+@pytest.fixture(autouse=True)
+def clear_llm_response_cache():
+    cache._llm_response_cache.clear()
+    yield
+    cache._llm_response_cache.clear()
+
+
+class _Runner:
+    def __init__(self, *outputs):
+        self.outputs = list(outputs)
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0)
+        return self.outputs.pop(0)
+
+
+async def test_same_request_is_served_from_the_cache():
+    runner = _Runner("yes")
+    assert await cached_agent_run(b"page", runner, model_name=MODEL) == "yes"
+    assert await cached_agent_run(b"page", runner, model_name=MODEL) == "yes"
+    assert runner.calls == 1
+
+
+async def test_different_requests_and_models_are_kept_apart():
+    runner = _Runner("a", "b", "c")
+    assert await cached_agent_run(b"page", runner, model_name=MODEL) == "a"
+    assert await cached_agent_run(b"other", runner, model_name=MODEL) == "b"
+    assert await cached_agent_run(b"page", runner, model_name="other-model") == "c"
+    assert runner.calls == 3
+
+
+async def test_concurrent_identical_requests_share_one_call():
+    runner = _Runner("yes")
+    outputs = await asyncio.gather(
+        *(cached_agent_run(b"page", runner, model_name=MODEL) for _ in range(5))
+    )
+    assert outputs == ["yes"] * 5
+    assert runner.calls == 1
+    assert not cache._llm_response_locks[asyncio.get_running_loop()]
+
+
+async def test_queued_callers_keep_the_key_locked():
+    gates = [asyncio.Event() for _ in range(3)]
+    calls = running = max_running = 0
+
+    async def failing():
+        nonlocal calls, running, max_running
+        gate = gates[calls]
+        calls += 1
+        running += 1
+        max_running = max(max_running, running)
+        try:
+            await gate.wait()
+            raise RuntimeError("model error")
+        finally:
+            running -= 1
+
+    async def call():
+        with pytest.raises(RuntimeError):
+            await cached_agent_run(b"page", failing, model_name=MODEL)
+
+    first = asyncio.create_task(call())
+    queued = asyncio.create_task(call())
+    await asyncio.sleep(0)
+    gates[0].set()
+    await first
+    # Arrives while the queued caller runs, and must wait for it
+    late = asyncio.create_task(call())
+    await asyncio.sleep(0)
+    gates[1].set()
+    gates[2].set()
+    await asyncio.gather(queued, late)
+    assert calls == 3
+    assert max_running == 1
+    assert not cache._llm_response_locks[asyncio.get_running_loop()]
+
+
+async def test_expired_entries_are_run_again():
+    runner = _Runner("old", "new")
+    assert await cached_agent_run(b"page", runner, model_name=MODEL, ttl=0) == "old"
+    assert await cached_agent_run(b"page", runner, model_name=MODEL) == "new"
+    assert runner.calls == 2
+
+
+async def test_failed_runs_are_not_cached():
+    calls = 0
+
+    async def failing():
+        nonlocal calls
+        calls += 1
+        raise RuntimeError("model error")
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await cached_agent_run(b"page", failing, model_name=MODEL)
+    assert calls == 2
+    assert not cache._llm_response_locks[asyncio.get_running_loop()]
+
+
+def test_full_cache_drops_the_oldest_entry(monkeypatch):
+    monkeypatch.setattr(cache, "_LLM_RESPONSE_CACHE_MAXSIZE", 2)
+    cache._put_cached("first", 1, expires_at=100, now=0)
+    cache._put_cached("second", 2, expires_at=100, now=0)
+    cache._put_cached("third", 3, expires_at=100, now=0)
+    assert list(cache._llm_response_cache) == ["second", "third"]
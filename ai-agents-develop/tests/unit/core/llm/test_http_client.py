@@ -0,0 +1,65 @@
+import asyncio
+
+import httpx
+
+from app.core.llm.http_client import (
+    _LoopBoundTransport,
+    close_openai_http_connections,
+    get_openai_http_client,
+)
+
+
+def test_openai_http_client_is_shared():
+    assert get_openai_http_client() is get_openai_http_client()
+
+
+def test_each_event_loop_gets_its_own_connection_pool():
+    transport = _LoopBoundTransport()
+
+    async def get_pool() -> httpx.AsyncHTTPTransport:
+        pool = transport._get_transport()
+        # Same loop, same pool
+        assert transport._get_transport() is pool
+        return pool
+
+    first = asyncio.run(get_pool())
+    second = asyncio.run(get_pool())
+    assert first is not second
+
+
+def test_close_only_drops_the_running_loop_pool():
+    transport = _LoopBoundTransport()
+
+    async def open_and_close() -> None:
+        transport._get_transport()
+        assert len(transport._transports) == 1
+        await transport.aclose()
+        assert len(transport._transports) == 0
+
+    asyncio.run(open_and_close())
+
+
+def test_requests_are_served_by_the_running_loop_pool():
+    calls: list[asyncio.AbstractEventLoop] = []
+
+    class _RecordingTransport(httpx.AsyncHTTPTransport):
+        async def handle_async_request(self, request):
+            calls.append(asyncio.get_running_loop())
+            return httpx.Response(200, json={"ok": True})
+
+    transport = _LoopBoundTransport()
+
+    async def request() -> None:
+        transport._transports[asyncio.get_running_loop()] = _RecordingTransport()
+        async with httpx.AsyncClient(transport=transport) as client:
+            response = await client.get("https://api.openai.com/v1/models")
+        assert response.json() == {"ok": True}
+
+    asyncio.run(request())
+    asyncio.run(request())
+    assert len(calls) == 2
+    assert calls[0] is not calls[1]
+
+
+async def test_close_openai_http_connections_without_requests():
+    await close_openai_http_connections()
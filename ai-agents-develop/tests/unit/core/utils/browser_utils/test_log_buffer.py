@@ -0,0 +1,72 @@
+import asyncio
+
+from app.core.agents.utils.browser_utils.log_buffer import StepLogBuffer
+
+
+class _FakeDeps:
+    def __init__(self):
+        self.batches: list[list] = []
+
+    async def add_logs(self, batch):
+        self.batches.append(batch)
+
+
+def _written(deps: _FakeDeps) -> list:
+    return [logs for batch in deps.batches for logs in batch]
+
+
+async def test_close_writes_pending_logs_in_order():
+    deps = _FakeDeps()
+    buffer = StepLogBuffer(deps, flush_interval=60)
+    buffer.append(["step 1"])
+    buffer.append(lambda: ["step 2"])
+    buffer.append(["step 3"])
+    await buffer.aclose()
+    assert _written(deps) == [["step 1"], ["step 2"], ["step 3"]]
+
+
+async def test_logs_are_written_in_the_background():
+    deps = _FakeDeps()
+    buffer = StepLogBuffer(deps, flush_interval=0.01)
+    buffer.append(["step 1"])
+    await asyncio.sleep(0.05)
+    assert _written(deps) == [["step 1"]]
+    await buffer.aclose()
+
+
+async def test_full_batch_is_written_without_waiting_for_the_interval():
+    deps = _FakeDeps()
+    buffer = StepLogBuffer(deps, max_batch=2, flush_interval=60)
+    buffer.append(["step 1"])
+    buffer.append(["step 2"])
+    await asyncio.sleep(0.01)
+    assert deps.batches == [[["step 1"], ["step 2"]]]
+    await buffer.aclose()
+
+
+async def test_oldest_entries_are_dropped_when_full():
+    deps = _FakeDeps()
+    buffer = StepLogBuffer(deps, max_batch=10, flush_interval=60, max_queue=2)
+    for step in range(3):
+        buffer.append([f"step {step}"])
+    await buffer.aclose()
+    assert _written(deps) == [["step 1"], ["step 2"]]
+
+
+async def test_failing_producer_does_not_drop_other_logs():
+    deps = _FakeDeps()
+    buffer = StepLogBuffer(deps, flush_interval=60)
+
+    def failing_upload():
+        raise RuntimeError("upload failed")
+
+    buffer.append(failing_upload)
+    buffer.append(["step 2"])
+    await buffer.aclose()
+    assert _written(deps) == [["step 2"]]
+
+
+async def test_close_without_logs_writes_nothing():
+    deps = _FakeDeps()
+    await StepLogBuffer(deps).aclose()
+    assert deps.batches == []